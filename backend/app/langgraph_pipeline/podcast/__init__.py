@@ -1,6 +1,6 @@
 # app/langgraph_pipeline/podcast/__init__.py
 
-from .graph import run_podcast_generation, create_podcast_graph
+from .graph import run_podcast_generation, create_podcast_graph, get_podcast_app
 from .state import PodcastState
 from .metadata_generator_node import MetadataGenerator 
 
@@ -11,8 +11,8 @@ from .audio_processor import AudioProcessor
 __all__ = [
     'run_podcast_generation',
     'create_podcast_graph',
+    'get_podcast_app',
     'PodcastState',
-    'generate_korean_names',
     'MetadataGenerator',
     'ScriptGenerator',
     'TTSService',
@@ -1,6 +1,7 @@
 # app/langgraph_pipeline/podcast/audio_processor.py
 import os
 import uuid
+import wave
 import subprocess
 import logging
 from typing import List, Dict, Any
@@ -8,8 +9,6 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
-INTER_CHUNK_DELAY = 1.0
-
 
 def get_output_dir() -> str:
     """환경에 맞는 출력 디렉토리 반환"""
@@ -35,42 +34,53 @@ class AudioProcessor:
         output_dir = get_output_dir()
         os.makedirs(output_dir, exist_ok=True)
 
-        list_file_path = os.path.join(output_dir, "concat_list.txt")
         final_filename = os.path.join(output_dir, f"podcast_episode_{uuid.uuid4().hex[:8]}.mp3")
         
         try:
-            # FFmpeg concat 파일 생성
-            with open(list_file_path, "w", encoding="utf-8") as f:
-                for file in wav_files:
-                    f.write(f"file '{os.path.abspath(file)}'\n")
+            # WAV 헤더를 건너뛰고 PCM 프레임만 이어붙임 (모든 청크는 동일 포맷)
+            pcm_chunks = []
+            params = None
+            for file in wav_files:
+                with wave.open(file, "rb") as w:
+                    file_params = (w.getnchannels(), w.getsampwidth(), w.getframerate())
+                    if params is None:
+                        params = file_params
+                    elif file_params != params:
+                        raise ValueError(f"오디오 포맷 불일치: {file} {file_params} != {params}")
+                    pcm_chunks.append(w.readframes(w.getnframes()))
             
-            # FFmpeg 실행
+            num_channels, sample_width, sample_rate = params
+            
+            # FFmpeg 실행: raw PCM을 stdin으로 넘겨 한 번만 인코딩
+            # (진행 로그는 끄고 오류만 stderr로 받아 실패 시 메시지로 사용)
             command = [
-                "ffmpeg", "-f", "concat", "-safe", "0", "-i", list_file_path,
+                "ffmpeg", "-hide_banner", "-loglevel", "error", "-f", f"s{sample_width * 8}le", "-ar", str(sample_rate), "-ac", str(num_channels),
+                "-i", "pipe:0",
                 "-c:a", "libmp3lame", "-b:a", "192k", "-y", final_filename
             ]
             
             subprocess.run(
                 command, 
+                input=b"".join(pcm_chunks),
                 check=True, 
-                capture_output=True, 
-                text=True, 
-                encoding="utf-8"
+                capture_output=True
             )
             
             # 임시 파일 정리
-            os.remove(list_file_path)
             for file in wav_files:
-                if os.path.exists(file):
+                try:
                     os.remove(file)
+                except FileNotFoundError:
+                    pass
             
             logger.info(f"병합 완료: {final_filename}")
             
             return final_filename
             
         except subprocess.CalledProcessError as e:
-            logger.error(f"FFmpeg 오류: {e.stderr}")
-            raise RuntimeError(f"오디오 병합 실패: {e.stderr}")
+            stderr = e.stderr.decode("utf-8", errors="replace") if e.stderr else ""
+            logger.error(f"FFmpeg 오류: {stderr}")
+            raise RuntimeError(f"오디오 병합 실패: {stderr}")
         except Exception as e:
             logger.error(f"병합 오류: {e}")
             raise
@@ -91,21 +101,6 @@ class AudioProcessor:
         """
         logger.info("타임스탬프 스크립트 생성 중...")
         
-        current_time = 0.0
-        transcript_lines = []
-        
-        for item in audio_metadata:
-            seconds = int(current_time)
-            hh = seconds // 3600
-            mm = (seconds % 3600) // 60
-            ss = seconds % 60
-            timestamp = f"[{hh:02}:{mm:02}:{ss:02}]"
-            
-            line = f"{timestamp} [{item['speaker']}]: {item['text']}"
-            transcript_lines.append(line)
-            
-            current_time += item['duration'] + INTER_CHUNK_DELAY
-        
         # ✅ output_path에서 파일명 추출 후 .txt로 변경
         if not output_path or not os.path.basename(output_path):
             # output_path가 디렉토리거나 빈 값인 경우 fallback
@@ -123,8 +118,22 @@ class AudioProcessor:
         # 디렉토리 확인
         os.makedirs(os.path.dirname(transcript_path), exist_ok=True)
         
+        # 정수 밀리초 누적으로 타임스탬프 계산, 줄 단위로 바로 기록
+        current_ms = 0
         with open(transcript_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(transcript_lines))
+            for i, item in enumerate(audio_metadata):
+                hh, rem = divmod(current_ms // 1000, 3600)
+                mm, ss = divmod(rem, 60)
+                
+                if i:
+                    f.write("\n")
+                f.write(f"[{hh:02}:{mm:02}:{ss:02}] [{item['speaker']}]: {item['text']}")
+                
+                duration_ms = item.get('duration_ms')
+                if duration_ms is None:
+                    duration_ms = int(item['duration'] * 1000)
+                # 병합 시 청크 사이에 무음을 넣지 않으므로 길이만 누적
+                current_ms += duration_ms
         
         logger.info(f"스크립트 생성 완료: {transcript_path}")
         
@@ -5,15 +5,19 @@ Document Converter Node
 
 import os
 import tempfile
+import threading
 from pathlib import Path
 from typing import Optional, Union
 from enum import Enum
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, FeatureNotFound
 from io import BytesIO
 
 # Document processing
 from docx import Document as DocxDocument
+from docx.oxml.ns import qn
 from pptx import Presentation
 from pdf2image import convert_from_path
 from PIL import Image
@@ -23,6 +27,22 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# LibreOffice는 같은 사용자 프로필로 동시 실행되면 변환이 실패하므로 직렬화
+_LIBREOFFICE_LOCK = threading.Lock()
+
+
+def _create_http_session() -> requests.Session:
+    """커넥션 풀 + 재시도가 설정된 공용 세션 (같은 호스트는 TCP/TLS 연결 재사용)"""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_HTTP = _create_http_session()
+
 
 class DocumentType(Enum):
     """지원하는 문서 타입"""
@@ -276,7 +296,8 @@ class DocumentConverterNode:
                 source
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            with _LIBREOFFICE_LOCK:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
             
             if result.returncode == 0:
                 # LibreOffice는 원본 파일명.pdf로 저장
@@ -305,10 +326,17 @@ class DocumentConverterNode:
         c = canvas.Canvas(output_path, pagesize=A4)
         width, height = A4
         
+        # Paragraph 객체를 만들지 않고 본문 <w:p> 요소에서 <w:t> 텍스트만 바로 읽음
+        w_p, w_t = qn('w:p'), qn('w:t')
+        paragraph_texts = (
+            "".join(t.text or "" for t in p.iter(w_t))
+            for p in doc.element.body.iterchildren(w_p)
+        )
+        
         y_position = height - 50
-        for para in doc.paragraphs:
-            if para.text.strip():
-                c.drawString(50, y_position, para.text[:100])  # 간단히 처리
+        for text in paragraph_texts:
+            if text.strip():
+                c.drawString(50, y_position, text[:100])  # 간단히 처리
                 y_position -= 20
                 
                 if y_position < 50:
@@ -336,7 +364,8 @@ class DocumentConverterNode:
                 source
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            with _LIBREOFFICE_LOCK:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
             
             if result.returncode == 0:
                 temp_pdf = self.output_dir / f"{Path(source).stem}.pdf"
@@ -401,7 +430,8 @@ class DocumentConverterNode:
                 source
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            with _LIBREOFFICE_LOCK:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
             
             if result.returncode == 0:
                 temp_pdf = self.output_dir / f"{Path(source).stem}.pdf"
@@ -429,11 +459,14 @@ class DocumentConverterNode:
         """
         try:
             # 웹페이지 가져오기
-            response = requests.get(url, timeout=30)
+            response = _HTTP.get(url, timeout=30)
             response.raise_for_status()
-            response.encoding = 'utf-8'  # UTF-8 인코딩 명시
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # 바이트를 그대로 넘겨 인코딩은 문서 선언(meta charset)으로 감지, 파서는 C 기반 lxml 우선
+            try:
+                soup = BeautifulSoup(response.content, 'lxml')
+            except FeatureNotFound:
+                soup = BeautifulSoup(response.content, 'html.parser')
             
             # 불필요한 요소 제거
             for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe', 'noscript']):
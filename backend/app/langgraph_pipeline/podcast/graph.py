@@ -1,8 +1,9 @@
 # app/langgraph_pipeline/podcast/graph.py
 
+import asyncio
 import logging
-import json
 import os
+import threading
 import uuid
 from typing import List, Dict, Any
 from langgraph.graph import StateGraph, END
@@ -11,7 +12,7 @@ from langgraph.checkpoint.memory import MemorySaver
 from .state import PodcastState
 from .metadata_generator_node import MetadataGenerator 
 from .script_generator import ScriptGenerator
-from .tts_service import TTSService
+from .tts_service import TTSService, TTS_CACHE_ENABLED, TTS_PREFETCH_ENABLED
 from .audio_processor import AudioProcessor
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,7 @@ def get_temp_output_dir() -> str:
     return base
 
 
+# 노드는 변경된 키만 반환 (LangGraph가 state에 병합, errors는 add 리듀서로 누적)
 def extract_texts_node(state: PodcastState) -> PodcastState:
     """노드 1: MetadataGenerator를 사용하여 텍스트와 이미지 설명 추출"""
     logger.info("메타데이터 생성 및 텍스트 추출 시작...")
@@ -32,7 +34,6 @@ def extract_texts_node(state: PodcastState) -> PodcastState:
     
     if not main_sources:
         return {
-            **state,
             "errors": ["처리할 주 소스 파일이 없습니다."],
             "current_step": "error"
         }
@@ -45,21 +46,16 @@ def extract_texts_node(state: PodcastState) -> PodcastState:
 
         generator = MetadataGenerator()
         
-        #  환경 변수 기반 경로 사용
-        output_dir = get_temp_output_dir()
-        temp_json_path = os.path.join(output_dir, f"temp_metadata_{uuid.uuid4().hex[:8]}.json")
-        
-        generated_path = generator.generate(
+        # 임시 JSON 파일을 거치지 않고 메모리에서 바로 사용
+        source_data = generator.generate_data(
             primary_file=primary_file,
-            supplementary_files=supplementary_files,
-            output_path=temp_json_path
+            supplementary_files=supplementary_files
         )
         
-        with open(generated_path, 'r', encoding='utf-8') as f:
-            source_data = json.load(f)
-            
-        if os.path.exists(generated_path):
-            os.remove(generated_path)
+        # 디버깅용 메타데이터 파일 저장 (opt-in)
+        if os.getenv("SAVE_METADATA_JSON", "false").lower() == "true":
+            output_dir = get_temp_output_dir()
+            generator.save(source_data, os.path.join(output_dir, f"metadata_{uuid.uuid4().hex[:8]}.json"))
         
         main_texts = []
         aux_texts = []
@@ -70,36 +66,40 @@ def extract_texts_node(state: PodcastState) -> PodcastState:
             if text:
                 images = primary.get("filtered_images", [])
                 if images:
-                    text += "\n\n=== [VISUAL CONTEXT] (Images in the document) ===\n"
-                    for img in images:
-                        desc = img.get("description", "")
-                        page = img.get("page_number", "?")
-                        text += f"- Page {page}: {desc}\n"
+                    visual_lines = [
+                        f"- Page {img.get('page_number', '?')}: {img.get('description', '')}\n"
+                        for img in images
+                    ]
+                    text = "".join([text, "\n\n=== [VISUAL CONTEXT] (Images in the document) ===\n", *visual_lines])
                 
                 main_texts.append(text)
 
+        # 같은 자료가 중복 업로드된 경우 (주/보조 간, 보조끼리) 한 번만 프롬프트에 포함
+        seen_texts = {primary.get("content", {}).get("full_text", "")} if primary else set()
         supp_list = source_data.get("supplementary_sources", [])
         for supp in supp_list:
             text = supp.get("content", {}).get("full_text", "")
-            if text:
-                aux_texts.append(text)
+            if not text:
+                continue
+            if text in seen_texts:
+                logger.info(f"중복 보조 소스 제외: {supp.get('filename', '?')}")
+                continue
+            seen_texts.add(text)
+            aux_texts.append(text)
 
         logger.info(f"파싱 완료 - Main: {len(main_texts)}개, Aux: {len(aux_texts)}개")
         
         return {
-            **state,
             "source_data": source_data,
             "main_texts": main_texts,
             "aux_texts": aux_texts,
-            "errors": [],
             "current_step": "extract_complete"
         }
 
     except Exception as e:
         logger.error(f"메타데이터 생성 실패: {e}", exc_info=True)
         return {
-            **state,
-            "errors": state.get('errors', []) + [f"추출 오류: {str(e)}"],
+            "errors": [f"추출 오류: {str(e)}"],
             "current_step": "error"
         }
 
@@ -110,22 +110,25 @@ def combine_texts_node(state: PodcastState) -> PodcastState:
     
     if not state['main_texts']:
         return {
-            **state,
-            "errors": state.get('errors', []) + ["주 소스 텍스트가 없습니다."],
+            "errors": ["주 소스 텍스트가 없습니다."],
             "current_step": "error"
         }
     
-    formatted_text = "=== [MAIN SOURCE] (Core Content) ===\n"
-    formatted_text += "The following content is the primary topic. Focus the script on this.\n\n"
-    formatted_text += "\n\n---\n\n".join(state['main_texts'])
+    # 큰 텍스트를 += 로 반복 복사하지 않도록 조각을 모아 한 번에 결합
+    parts = [
+        "=== [MAIN SOURCE] (Core Content) ===\n",
+        "The following content is the primary topic. Focus the script on this.\n\n",
+        "\n\n---\n\n".join(state['main_texts']),
+    ]
     
     if state['aux_texts']:
-        formatted_text += "\n\n\n=== [AUXILIARY SOURCE] (Reference/Context) ===\n"
-        formatted_text += "Use the following content only for supporting details.\n\n"
-        formatted_text += "\n\n---\n\n".join(state['aux_texts'])
+        parts.append("\n\n\n=== [AUXILIARY SOURCE] (Reference/Context) ===\n")
+        parts.append("Use the following content only for supporting details.\n\n")
+        parts.append("\n\n---\n\n".join(state['aux_texts']))
+    
+    formatted_text = "".join(parts)
     
     return {
-        **state,
         "combined_text": formatted_text,
         "current_step": "combine_complete"
     }
@@ -142,6 +145,13 @@ def generate_script_node(state: PodcastState) -> PodcastState:
             style=state.get('style', 'explain')
         )
         
+        # 스크립트 스트리밍 중 완성된 화자 턴을 바로 TTS 선행 합성 (결과는 TTS 캐시로 전달됨)
+        on_turn = None
+        if TTS_CACHE_ENABLED and TTS_PREFETCH_ENABLED:
+            tts = TTSService()
+            host_name, guest_name = state['host_name'], state['guest_name']
+            on_turn = lambda speaker, content: tts.prefetch_turn(speaker, content, host_name, guest_name)
+        
         #  [수정] difficulty 파라미터 전달 추가
         result = generator.generate_script(
             combined_text=state['combined_text'],
@@ -149,15 +159,15 @@ def generate_script_node(state: PodcastState) -> PodcastState:
             guest_name=state['guest_name'],
             duration=state.get('duration', 5),
             difficulty=state.get('difficulty', 'intermediate'), # <--- 여기 추가됨
-            user_prompt=state.get('user_prompt', "")
+            user_prompt=state.get('user_prompt', ""),
+            on_turn=on_turn
         )
         
-        new_usage = state.get("usage", {})
+        new_usage = dict(state.get("usage") or {})
         if "usage" in result:
             new_usage.update(result["usage"])
 
         return {
-            **state,
             "title": result.get("title", "Untitled"),
             "script": result.get("script", ""),
             "usage": new_usage,
@@ -165,33 +175,33 @@ def generate_script_node(state: PodcastState) -> PodcastState:
         }
     except Exception as e:
         logger.error(f"스크립트 생성 오류: {e}")
-        return {**state, "errors": state.get('errors', []) + [str(e)], "current_step": "error"}
+        return {"errors": [str(e)], "current_step": "error"}
 
 
-def generate_audio_node(state: PodcastState) -> PodcastState:
-    """노드 4: TTS 변환"""
+async def generate_audio_node(state: PodcastState) -> PodcastState:
+    """노드 4: TTS 변환 (그래프의 이벤트 루프에서 청크를 동시에 생성)"""
     logger.info("TTS 변환 중...")
     try:
         tts = TTSService()
-        metadata, files = tts.generate_audio(state['script'], state['host_name'], state['guest_name'])
-        return {**state, "audio_metadata": metadata, "wav_files": files, "current_step": "audio_complete"}
+        metadata, files = await tts.agenerate_audio(state['script'], state['host_name'], state['guest_name'])
+        return {"audio_metadata": metadata, "wav_files": files, "current_step": "audio_complete"}
     except Exception as e:
         logger.error(f"TTS 오류: {e}")
-        return {**state, "errors": state.get('errors', []) + [str(e)], "current_step": "error"}
+        return {"errors": [str(e)], "current_step": "error"}
 
 
 def merge_audio_node(state: PodcastState) -> PodcastState:
     """노드 5: 오디오 병합"""
     logger.info("오디오 병합 중...")
     if not state.get('wav_files'):
-         return {**state, "errors": state.get('errors', []) + ["오디오 파일 없음"], "current_step": "error"}
+         return {"errors": ["오디오 파일 없음"], "current_step": "error"}
     try:
         processor = AudioProcessor()
         path = processor.merge_audio_files(state['wav_files'])
-        return {**state, "final_podcast_path": path, "current_step": "merge_complete"}
+        return {"final_podcast_path": path, "current_step": "merge_complete"}
     except Exception as e:
         logger.error(f"병합 오류: {e}")
-        return {**state, "errors": state.get('errors', []) + [str(e)], "current_step": "error"}
+        return {"errors": [str(e)], "current_step": "error"}
 
 
 def generate_transcript_node(state: PodcastState) -> PodcastState:
@@ -200,14 +210,25 @@ def generate_transcript_node(state: PodcastState) -> PodcastState:
     try:
         processor = AudioProcessor()
         path = processor.generate_transcript(state['audio_metadata'], state['final_podcast_path'])
-        return {**state, "transcript_path": path, "current_step": "complete"}
+        return {"transcript_path": path, "current_step": "complete"}
     except Exception as e:
         logger.error(f"트랜스크립트 오류: {e}")
-        return {**state, "errors": state.get('errors', []) + [str(e)], "current_step": "error"}
+        return {"errors": [str(e)], "current_step": "error"}
+
 
+def _route_on_error(next_node: str):
+    """current_step이 error면 END, 아니면 다음 노드로 분기"""
+    def route(state: PodcastState) -> str:
+        return END if state.get("current_step") == "error" else next_node
+    return route
 
-def create_podcast_graph():
-    """LangGraph 그래프 정의"""
+
+def create_podcast_graph(with_checkpointer: bool = True, checkpointer=None):
+    """
+    LangGraph 그래프 정의
+    - 중단/재개가 없는 단방향 흐름이므로 일회성 실행은 with_checkpointer=False로
+      노드마다 큰 state(source_data, combined_text)를 스냅샷하는 비용을 생략
+    """
     workflow = StateGraph(PodcastState)
     
     workflow.add_node("extract_texts", extract_texts_node)
@@ -218,14 +239,33 @@ def create_podcast_graph():
     workflow.add_node("generate_transcript", generate_transcript_node)
 
     workflow.set_entry_point("extract_texts")
-    workflow.add_edge("extract_texts", "combine_texts")
-    workflow.add_edge("combine_texts", "generate_script")
-    workflow.add_edge("generate_script", "generate_audio")
-    workflow.add_edge("generate_audio", "merge_audio")
-    workflow.add_edge("merge_audio", "generate_transcript")
+    
+    # 오류 발생 시 이후 노드(Vertex 초기화, TTS 등)를 건너뛰고 바로 종료
+    steps = ["extract_texts", "combine_texts", "generate_script", "generate_audio", "merge_audio", "generate_transcript"]
+    for current, nxt in zip(steps, steps[1:]):
+        workflow.add_conditional_edges(current, _route_on_error(nxt), {nxt: nxt, END: END})
     workflow.add_edge("generate_transcript", END)
 
-    return workflow.compile(checkpointer=MemorySaver())
+    if not with_checkpointer:
+        return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer or MemorySaver())
+
+
+_podcast_app = None
+_podcast_app_lock = threading.Lock()
+
+
+def get_podcast_app():
+    """
+    컴파일된 그래프를 프로세스 단위로 재사용
+    - 체크포인터 없이 컴파일하므로 실행 간 공유되는 상태가 없음
+    """
+    global _podcast_app
+    if _podcast_app is None:
+        with _podcast_app_lock:
+            if _podcast_app is None:
+                _podcast_app = create_podcast_graph(with_checkpointer=False)
+    return _podcast_app
 
 
 def run_podcast_generation(
@@ -276,13 +316,15 @@ def run_podcast_generation(
         "user_prompt": user_prompt
     }
 
-    app = create_podcast_graph()
-    config = {"configurable": {"thread_id": f"podcast_generation_{id(initial_state)}"}}
+    app = get_podcast_app()
+    thread_id = f"podcast_generation_{uuid.uuid4().hex}"
+    config = {"configurable": {"thread_id": thread_id}}
 
     logger.info("LangGraph 워크플로우 시작...")
 
     try:
-        final_state = app.invoke(initial_state, config)
+        # TTS 노드가 async이므로 비동기 실행 (동기 진입점이라 여기서 이벤트 루프 생성)
+        final_state = asyncio.run(app.ainvoke(initial_state, config))
         
         if final_state.get('errors'):
             logger.warning(f"오류 발생: {final_state['errors']}")
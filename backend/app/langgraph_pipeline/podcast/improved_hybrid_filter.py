@@ -9,22 +9,140 @@ Improved Hybrid Filter V2 (get_images() 방식)
 """
 
 import os
-import vertexai
+import re
+import numpy as np
 import textwrap
 import json
-from dataclasses import dataclass
-from typing import List, Dict
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, List, Dict
 from pptx import Presentation
 from vertexai.generative_models import GenerativeModel, Part
+from .vertex_auth import ensure_vertex_init
 
-# [1] 인증 설정
-SERVICE_ACCOUNT_FILE = "vertex-ai-service-account.json"
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = SERVICE_ACCOUNT_FILE
-PROJECT_ID = "alan-document-lab" 
-vertexai.init(project=PROJECT_ID, location="us-central1")
+# numba는 선택 의존성: 설치되어 있으면 대형 덱의 규칙 필터를 JIT 커널로 평가
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# 키워드 추출 결과 캐시: 같은 문서(앞부분 텍스트)를 다시 처리하면 LLM 호출 생략
+KEYWORD_CACHE_SIZE = int(os.getenv("KEYWORD_CACHE_SIZE", "128"))
+_keyword_cache: Dict[bytes, List[str]] = {}
+_keyword_cache_lock = threading.Lock()
+
+# PaddleOCR 엔진은 스레드 안전하지 않으므로 프로세스 내 모든 OCR 호출을 이 락으로 직렬화
+# (metadata_generator_node의 공유 엔진도 같은 락 사용)
+OCR_LOCK = threading.Lock()
+_ocr_engine = None
+
+# PyMuPDF/pdfplumber 문서 객체도 여러 스레드에서 동시에 쓰면 안 되므로 프로세스 내 PDF 파싱을 직렬화
+# (보조자료 스레드와 주강의자료 처리가 겹쳐도 파싱은 한 번에 하나씩, 변환/다운로드 등 외부 작업만 동시 진행)
+PDF_LOCK = threading.RLock()
+
+
+def _get_ocr_engine():
+    """이미지 추출용 PaddleOCR 엔진 (최초 사용 시 1회 생성, OCR_LOCK을 잡은 상태에서 호출)"""
+    global _ocr_engine
+    if _ocr_engine is None:
+        from paddleocr import PaddleOCR
+        
+        os.environ['FLAGS_log_level'] = '3'
+        os.environ['PPOCR_SHOW_LOG'] = 'False'
+        
+        print(f"      → PaddleOCR 초기화 중...")
+        _ocr_engine = PaddleOCR(lang='korean', use_textline_orientation=True)
+    return _ocr_engine
+
+
+def _strip_code_fence(text: str) -> str:
+    """```json ... ``` 코드블록이 있으면 안쪽 내용만 반환 (split 리스트 없이 위치만 찾음)"""
+    start = text.find("```")
+    if start < 0:
+        return text
+    start += 3
+    if text.startswith("json", start):
+        start += 4
+    end = text.find("```", start)
+    return text[start:end if end >= 0 else len(text)].strip()
+
+# [1] 인증 설정 (서버와 동일한 환경 변수 우선, 없으면 로컬 개발용 기본값)
+DEFAULT_SERVICE_ACCOUNT_FILE = "vertex-ai-service-account.json"
+DEFAULT_PROJECT_ID = "alan-document-lab"
+
+
+# [2] Gemini 2.5 Flash 모델 로드 (import 시점이 아닌 최초 사용 시 1회만 초기화)
+@lru_cache(maxsize=1)
+def get_model() -> GenerativeModel:
+    sa_file = (
+        os.getenv("VERTEX_AI_SERVICE_ACCOUNT_FILE")
+        or os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+        or DEFAULT_SERVICE_ACCOUNT_FILE
+    )
+    # 스크립트 생성과 같은 초기화 경로 사용 (같은 설정이면 다시 초기화하지 않고, 서비스 계정 인증 정보 전달)
+    ensure_vertex_init(
+        os.getenv("VERTEX_AI_PROJECT_ID", DEFAULT_PROJECT_ID),
+        os.getenv("VERTEX_AI_REGION", "us-central1"),
+        sa_file
+    )
+    return GenerativeModel("gemini-2.5-flash")
+
+# 규칙 필터 판정 코드: 0=PENDING, 1=코너 장식, 2=장식 키워드, 3=핵심 콘텐츠, 4=문서 키워드
+def _rule_codes_numpy(area, left, top, universal, deco, doc_kw):
+    corner = (top < 1.0) & ((left < 1.0) | (left > 8.0))
+    # 조건 우선순위는 기존 단건 규칙과 동일 (앞 조건이 우선)
+    return np.select(
+        [
+            corner & (area < 5.0) & ~universal,
+            deco & (area < 8.0),
+            (area > 15.0) & (universal | doc_kw),
+            doc_kw & (area > 10.0),
+        ],
+        [1, 2, 3, 4],
+        default=0,
+    ).astype(np.int8)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _rule_kernel(area, left, top, universal, deco, doc_kw, out):
+        for i in range(area.shape[0]):
+            a = area[i]
+            corner = top[i] < 1.0 and (left[i] < 1.0 or left[i] > 8.0)
+            if corner and a < 5.0 and not universal[i]:
+                out[i] = 1
+            elif deco[i] and a < 8.0:
+                out[i] = 2
+            elif a > 15.0 and (universal[i] or doc_kw[i]):
+                out[i] = 3
+            elif doc_kw[i] and a > 10.0:
+                out[i] = 4
+            else:
+                out[i] = 0
+
+# JIT 컴파일 비용이 의미 있으려면 이미지가 충분히 많아야 함
+_NUMBA_MIN_IMAGES = 256
+
+
+def _rule_codes(area, left, top, universal, deco, doc_kw) -> np.ndarray:
+    """이미지별 규칙 판정 코드 배열 계산"""
+    if NUMBA_AVAILABLE and area.shape[0] >= _NUMBA_MIN_IMAGES:
+        out = np.empty(area.shape[0], dtype=np.int8)
+        _rule_kernel(area, left, top, universal, deco, doc_kw, out)
+        return out
+    return _rule_codes_numpy(area, left, top, universal, deco, doc_kw)
+
+
+def presentation_text(prs: Presentation) -> str:
+    """키워드 추출용 슬라이드 텍스트 (텍스트가 있는 도형만)"""
+    return "\n".join(
+        shape.text for slide in prs.slides for shape in slide.shapes if hasattr(shape, "text")
+    )
 
-# [2] Gemini 2.5 Flash 모델 로드
-model = GenerativeModel("gemini-2.5-flash")
 
 @dataclass
 class ImageMetadata:
@@ -38,6 +156,15 @@ class ImageMetadata:
     image_bytes: bytes = None
     is_core_content: bool = False
     filter_reason: str = ""
+    # PPTX는 1차 필터를 통과한 이미지만 바이트가 필요하므로 shape 참조만 보관
+    _shape_ref: Any = field(default=None, repr=False, compare=False)
+
+    def load_bytes(self) -> bytes:
+        """이미지 바이트를 필요할 때 로드 (PPTX는 shape.image.blob 지연 접근)"""
+        if self.image_bytes is None and self._shape_ref is not None:
+            self.image_bytes = self._shape_ref.image.blob
+            self._shape_ref = None
+        return self.image_bytes
 
 # 1. 통합 이미지 추출기 (PPTX + PDF 지원)
 class UniversalImageExtractor:
@@ -46,48 +173,56 @@ class UniversalImageExtractor:
     V2: get_images() 방식으로 모든 이미지 감지
     """
     
-    def extract(self, file_path: str) -> List[ImageMetadata]:
+    def extract(self, file_path: str, prs: Presentation = None) -> List[ImageMetadata]:
+        """
+        prs: 호출 측에서 이미 파싱한 PPTX (같은 스레드에서만 사용, python-pptx 객체는 스레드 안전하지 않음)
+        """
         from pathlib import Path
         
         ext = Path(file_path).suffix.lower()
         
         if ext == '.pptx':
-            return self._extract_from_pptx(file_path)
+            return self._extract_from_pptx(file_path, prs)
         elif ext == '.pdf':
-            return self._extract_from_pdf_v2(file_path)
+            with PDF_LOCK:
+                return self._extract_from_pdf_v2(file_path)
         else:
             raise ValueError(f"지원하지 않는 형식: {ext}")
     
-    def _extract_from_pptx(self, pptx_path: str) -> List[ImageMetadata]:
+    def _extract_from_pptx(self, pptx_path: str, prs: Presentation = None) -> List[ImageMetadata]:
         """PPTX에서 이미지 추출 (기존 방식)"""
-        if not os.path.exists(pptx_path):
-            return []
-        
-        prs = Presentation(pptx_path)
+        if prs is None:
+            if not os.path.exists(pptx_path):
+                return []
+            prs = Presentation(pptx_path)
         metadata_list = []
+        # 슬라이드 크기는 덱 전체에서 동일하므로 면적 비율 계수를 한 번만 계산
         slide_width, slide_height = prs.slide_width.inches, prs.slide_height.inches
-        slide_area = slide_width * slide_height
+        area_pct_scale = 100.0 / (slide_width * slide_height)
 
         for s_idx, slide in enumerate(prs.slides, 1):
             slide_title = slide.shapes.title.text if slide.shapes.title else "No Title"
-            all_text = " ".join([s.text for s in slide.shapes if hasattr(s, "text")])
             
-            img_idx = 1
+            # shape 트리를 한 번만 순회하며 텍스트와 그림을 함께 수집
+            slide_text, pictures = [], []
             for shape in slide.shapes:
+                if hasattr(shape, "text"):
+                    slide_text.append(shape.text)
                 if shape.shape_type == 13 or hasattr(shape, 'image'):
-                    w, h = shape.width.inches, shape.height.inches
-                    area_pct = ((w * h) / slide_area) * 100
-                    metadata_list.append(ImageMetadata(
-                        image_id=f"S{s_idx:02d}_IMG{img_idx:03d}",
-                        slide_number=s_idx,
-                        area_percentage=area_pct,
-                        left=shape.left.inches,
-                        top=shape.top.inches,
-                        adjacent_text=all_text.replace('\n', ' ').strip(),
-                        slide_title=slide_title,
-                        image_bytes=shape.image.blob
-                    ))
-                    img_idx += 1
+                    pictures.append(shape)
+            adjacent_text = " ".join(slide_text).replace('\n', ' ').strip()
+            
+            for img_idx, shape in enumerate(pictures, 1):
+                metadata_list.append(ImageMetadata(
+                    image_id=f"S{s_idx:02d}_IMG{img_idx:03d}",
+                    slide_number=s_idx,
+                    area_percentage=shape.width.inches * shape.height.inches * area_pct_scale,
+                    left=shape.left.inches,
+                    top=shape.top.inches,
+                    adjacent_text=adjacent_text,
+                    slide_title=slide_title,
+                    _shape_ref=shape
+                ))
         
         return metadata_list
     
@@ -100,26 +235,17 @@ class UniversalImageExtractor:
             return text
         
         try:
-            from paddleocr import PaddleOCR
-            
-            if not hasattr(self, '_ocr_engine'):
-                os.environ['FLAGS_log_level'] = '3'
-                os.environ['PPOCR_SHOW_LOG'] = 'False'
-                
-                print(f"      → PaddleOCR 초기화 중...")
-                self._ocr_engine = PaddleOCR(lang='korean', use_textline_orientation=True)
-            
             pix = page.get_pixmap(dpi=150)
             img_data = pix.tobytes("png")
             
-            import numpy as np
             from PIL import Image
             from io import BytesIO
             
             img = Image.open(BytesIO(img_data))
             img_array = np.array(img)
             
-            result = self._ocr_engine.ocr(img_array)
+            with OCR_LOCK:
+                result = _get_ocr_engine().ocr(img_array)
             
             if result and result[0]:
                 lines = []
@@ -296,24 +422,34 @@ class UniversalImageExtractor:
         return metadata_list
 
 
+def _compile_patterns(patterns):
+    """부분 문자열 패턴 목록 → 정규식 하나 (빈 목록이면 None)"""
+    if not patterns:
+        return None
+    return re.compile("|".join(map(re.escape, patterns)))
+
+
 # 2. 개선된 하이브리드 필터 파이프라인
 class ImprovedHybridFilterPipeline:
+    UNIVERSAL_PATTERNS = (
+        '학습', '활동', '문제', '예제', '연습',
+        '생각', '알아보', '살펴보', '정리',
+        '목표', '개념', '원리', '법칙', '정의',
+        '단원', '차시',
+        '그림', '도표', '표', '차트', '그래프',
+        '예시', '사례', '모형', '구조'
+    )
+    
+    DECORATION_PATTERNS = (
+        '로고', 'logo', '출처', '참고', '아이콘', 'icon'
+    )
+    
+    # 고정 패턴은 클래스 정의 시 한 번만 컴파일 (문서 키워드는 문서마다 달라 호출 시 컴파일)
+    _UNIVERSAL_RE = _compile_patterns(UNIVERSAL_PATTERNS)
+    _DECORATION_RE = _compile_patterns(DECORATION_PATTERNS)
+    
     def __init__(self, auto_extract_keywords: bool = True):
         self.auto_extract = auto_extract_keywords
-        
-        self.UNIVERSAL_PATTERNS = [
-            '학습', '활동', '문제', '예제', '연습',
-            '생각', '알아보', '살펴보', '정리',
-            '목표', '개념', '원리', '법칙', '정의',
-            '단원', '차시',
-            '그림', '도표', '표', '차트', '그래프',
-            '예시', '사례', '모형', '구조'
-        ]
-        
-        self.DECORATION_PATTERNS = [
-            '로고', 'logo', '출처', '참고', '아이콘', 'icon'
-        ]
-        
         self.document_keywords = []
 
     def extract_keywords_from_document(self, file_path: str):
@@ -329,20 +465,22 @@ class ImprovedHybridFilterPipeline:
         all_text = []
         
         if ext == '.pptx':
-            prs = Presentation(file_path)
-            for slide in prs.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "text"):
-                        all_text.append(shape.text)
+            all_text.append(presentation_text(Presentation(file_path)))
         
         elif ext == '.pdf':
-            import pdfplumber
+            # PyMuPDF(C 구현)로 텍스트만 추출 - 레이아웃 재구성이 필요 없으므로 pdfplumber보다 훨씬 빠름
+            import fitz
             try:
-                with pdfplumber.open(file_path) as pdf:
-                    for page in pdf.pages:
-                        text = page.extract_text()
+                collected = 0
+                with PDF_LOCK, fitz.open(file_path) as doc:
+                    for page in doc:
+                        text = page.get_text("text")
                         if text:
                             all_text.append(text)
+                            collected += len(text)
+                        # 앞부분 5000자만 사용하므로 충분히 모이면 중단
+                        if collected >= 5000:
+                            break
             except Exception as e:
                 print(f"   ⚠️ PDF 텍스트 추출 실패, 범용 패턴만 사용")
                 return
@@ -351,7 +489,30 @@ class ImprovedHybridFilterPipeline:
             print(f"   ⚠️ 지원하지 않는 형식: {ext}")
             return
         
-        full_text = "\n".join(all_text)[:5000]
+        self._extract_keywords("\n".join(all_text))
+
+    def extract_keywords_from_text(self, text: str):
+        """이미 추출된 문서 텍스트로 키워드 추출 (문서를 다시 파싱하지 않음)"""
+        if not self.auto_extract:
+            return
+        
+        print("📚 문서 분석하여 키워드 자동 추출 중...")
+        if not text.strip():
+            print(f"   ⚠️ 문서 텍스트 없음, 범용 패턴만 사용")
+            return
+        self._extract_keywords(text)
+
+    def _extract_keywords(self, text: str):
+        """문서 앞부분 5000자로 LLM 키워드 추출 → self.document_keywords"""
+        full_text = text[:5000]
+        
+        cache_key = hashlib.blake2b(full_text.encode("utf-8"), digest_size=16).digest()
+        with _keyword_cache_lock:
+            cached = _keyword_cache.get(cache_key)
+        if cached is not None:
+            self.document_keywords = list(cached)
+            print(f"   ✅ 추출된 키워드 (캐시): {', '.join(self.document_keywords[:10])}")
+            return
         
         prompt = f"""
 다음 강의 자료에서 **핵심 키워드 20개**를 추출하세요.
@@ -365,7 +526,7 @@ class ImprovedHybridFilterPipeline:
 """
         
         try:
-            response = model.generate_content(prompt)
+            response = get_model().generate_content(prompt)
 
             # ✅ 토큰 추출
             usage = response.usage_metadata
@@ -377,14 +538,16 @@ class ImprovedHybridFilterPipeline:
 
             text = response.text.strip()
             
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
-            
-            data = json.loads(text)
+            data = json.loads(_strip_code_fence(text))
             self.document_keywords = data.get("keywords", [])
             
+            # 성공한 결과만 캐시 (가득 차면 가장 오래된 항목부터 제거)
+            if self.document_keywords and KEYWORD_CACHE_SIZE > 0:
+                with _keyword_cache_lock:
+                    while len(_keyword_cache) >= KEYWORD_CACHE_SIZE:
+                        _keyword_cache.pop(next(iter(_keyword_cache)))
+                    _keyword_cache[cache_key] = list(self.document_keywords)
+            
             print(f"   ✅ 추출된 키워드: {', '.join(self.document_keywords[:10])}")
         
         except Exception as e:
@@ -392,29 +555,53 @@ class ImprovedHybridFilterPipeline:
             self.document_keywords = []
 
     def step1_rule_check(self, meta: ImageMetadata):
-        """규칙 기반 1차 필터"""
-        context = f"{meta.slide_title} {meta.adjacent_text}".lower()
-        
-        has_deco = any(kw in context for kw in self.DECORATION_PATTERNS)
-        is_corner = (meta.left < 1.0 and meta.top < 1.0) or (meta.left > 8.0 and meta.top < 1.0)
-        
-        if is_corner and meta.area_percentage < 5.0 and not any(kw in context for kw in self.UNIVERSAL_PATTERNS):
-            return "EXCLUDE", "Static Decoration (Corner)"
-        
-        if has_deco and meta.area_percentage < 8.0:
-            return "EXCLUDE", "Decorative element"
-        
-        has_universal = any(p in context for p in self.UNIVERSAL_PATTERNS)
-        has_document_kw = any(kw in context for kw in self.document_keywords)
-        
-        if meta.area_percentage > 15.0 and (has_universal or has_document_kw):
-            return "INCLUDE", f"Core content ({meta.area_percentage:.1f}% + pattern)"
-        
-        if has_document_kw and meta.area_percentage > 10.0:
-            matched = [kw for kw in self.document_keywords if kw in context]
-            return "INCLUDE", f"Document keyword: {', '.join(matched[:2])}"
+        """규칙 기반 1차 필터 (단건, rule_check_all 래퍼)"""
+        return self.rule_check_all([meta])[0]
+
+    def rule_check_all(self, metas: List[ImageMetadata]):
+        """
+        규칙 기반 1차 필터 (전체 이미지 일괄)
+        - 패턴 목록은 정규식 하나로 합쳐 문맥 문자열당 한 번만 스캔
+        - 위치/면적 조건은 배열 단위로 한 번에 평가 (NumPy 마스크, 대형 덱은 numba 커널)
+        - 반환: 입력 순서대로 (판정, 사유) 리스트
+        """
+        n = len(metas)
+        if n == 0:
+            return []
         
-        return "PENDING", "Requires AI Vision Check"
+        contexts = [f"{m.slide_title} {m.adjacent_text}".lower() for m in metas]
+        universal = self._pattern_mask(self._UNIVERSAL_RE, contexts)
+        deco = self._pattern_mask(self._DECORATION_RE, contexts)
+        doc_kw = self._pattern_mask(_compile_patterns(self.document_keywords), contexts)
+        
+        # 파이썬 float과 동일한 경계 비교를 위해 float64 사용
+        area = np.fromiter((m.area_percentage for m in metas), dtype=np.float64, count=n)
+        left = np.fromiter((m.left for m in metas), dtype=np.float64, count=n)
+        top = np.fromiter((m.top for m in metas), dtype=np.float64, count=n)
+        
+        codes = _rule_codes(area, left, top, universal, deco, doc_kw)
+        
+        results = []
+        for meta, context, code in zip(metas, contexts, codes.tolist()):
+            if code == 1:
+                results.append(("EXCLUDE", "Static Decoration (Corner)"))
+            elif code == 2:
+                results.append(("EXCLUDE", "Decorative element"))
+            elif code == 3:
+                results.append(("INCLUDE", f"Core content ({meta.area_percentage:.1f}% + pattern)"))
+            elif code == 4:
+                matched = [kw for kw in self.document_keywords if kw in context]
+                results.append(("INCLUDE", f"Document keyword: {', '.join(matched[:2])}"))
+            else:
+                results.append(("PENDING", "Requires AI Vision Check"))
+        return results
+
+    @staticmethod
+    def _pattern_mask(pattern_re, contexts) -> np.ndarray:
+        """패턴 중 하나라도 부분 문자열로 포함된 문맥이면 True (pattern_re: _compile_patterns 결과)"""
+        if pattern_re is None:
+            return np.zeros(len(contexts), dtype=bool)
+        return np.fromiter((pattern_re.search(c) is not None for c in contexts), dtype=bool, count=len(contexts))
 
     def step2_gemini_check(self, meta: ImageMetadata, max_retries=3):
         """AI Vision으로 2차 판단"""
@@ -422,7 +609,7 @@ class ImprovedHybridFilterPipeline:
         
         for attempt in range(max_retries):
             try:
-                image_part = Part.from_data(data=meta.image_bytes, mime_type="image/png")
+                image_part = Part.from_data(data=meta.load_bytes(), mime_type="image/png")
                 
                 keyword_list = ', '.join(list(self.document_keywords)[:15]) if self.document_keywords else "일반 학습 내용"
                 
@@ -439,7 +626,7 @@ class ImprovedHybridFilterPipeline:
 
 출력: KEEP 또는 DISCARD로 시작
 """
-                response = model.generate_content([image_part, prompt])
+                response = get_model().generate_content([image_part, prompt])
 
                 # ✅ 토큰 및 비용 계산 추가
                 # ✅ Gemini 2.5 Flash 공식 단가 적용
@@ -466,6 +653,79 @@ class ImprovedHybridFilterPipeline:
         
         return "DISCARD: Failed after all retries", 0, 0.0
 
+    def step2_gemini_check_batch(self, metas: List[ImageMetadata], batch_size=8, max_workers=4):
+        """
+        AI Vision 2차 판단 (배치)
+        - 이미지 batch_size개를 한 요청에 묶어 판정 → 왕복 횟수 N → ceil(N/batch_size)
+        - 반환: 입력 순서대로 (판정 텍스트, tokens, cost) 리스트 (step2_gemini_check와 동일 형식)
+        - 배치 응답이 깨지거나 누락된 이미지는 단건 호출로 폴백
+        """
+        if not metas:
+            return []
+        
+        # PPTX 이미지는 같은 Presentation의 도형에서 지연 로드되므로 워커로 넘기기 전에 이 스레드에서 읽어 둠
+        for meta in metas:
+            meta.load_bytes()
+        
+        batches = [metas[i:i + batch_size] for i in range(0, len(metas), batch_size)]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            results = list(executor.map(self._check_batch, batches))
+        
+        return [r for batch_result in results for r in batch_result]
+
+    def _check_batch(self, batch: List[ImageMetadata]):
+        if len(batch) == 1:
+            return [self.step2_gemini_check(batch[0])]
+        
+        keyword_list = ', '.join(list(self.document_keywords)[:15]) if self.document_keywords else "일반 학습 내용"
+        
+        parts = []
+        for i, meta in enumerate(batch):
+            parts.append(f'[이미지 {i}] 주변 텍스트: "{meta.adjacent_text}"')
+            parts.append(Part.from_data(data=meta.load_bytes(), mime_type="image/png"))
+        parts.append(f"""
+이 강의의 핵심 주제: {keyword_list}
+
+위 {len(batch)}개 이미지 각각이 위 주제들과 관련있는지 판단하세요.
+
+판단:
+- 학습에 필요한 핵심 자료 → KEEP + 이유
+- 장식/로고/배경 → DISCARD + 이유
+
+출력: JSON 배열만. 예) [{{"id": 0, "verdict": "KEEP", "reason": "..."}}]
+""")
+        
+        try:
+            response = get_model().generate_content(
+                parts,
+                generation_config={"response_mime_type": "application/json"}
+            )
+            
+            input_tokens = response.usage_metadata.prompt_token_count
+            output_tokens = response.usage_metadata.candidates_token_count
+            total_tokens = response.usage_metadata.total_token_count
+            cost = (input_tokens / 1_000_000 * 0.075) + (output_tokens / 1_000_000 * 0.30)
+            
+            verdicts = {}
+            for item in json.loads(response.text):
+                verdict = str(item.get("verdict", "")).upper()
+                if verdict in ("KEEP", "DISCARD"):
+                    verdicts[int(item["id"])] = f"{verdict}: {item.get('reason', '')}".strip()
+        except Exception as e:
+            print(f"      ⚠️  배치 판정 실패, 개별 판정으로 전환: {e}")
+            return [self.step2_gemini_check(meta) for meta in batch]
+        
+        # 배치 사용량은 첫 이미지에 합산 (총합이 실제 사용량과 일치하도록)
+        results = []
+        for i, meta in enumerate(batch):
+            usage = (total_tokens, cost) if i == 0 else (0, 0.0)
+            if i in verdicts:
+                results.append((verdicts[i], *usage))
+            else:
+                text, tokens, single_cost = self.step2_gemini_check(meta)
+                results.append((text, tokens + usage[0], single_cost + usage[1]))
+        return results
+
     def run(self, source_path: str):
         """이미지 필터링 실행"""
         from pathlib import Path
@@ -492,8 +752,11 @@ class ImprovedHybridFilterPipeline:
             'ai_drop': 0,
         }
         
-        for meta in all_meta:
-            decision_type, s1_reason = self.step1_rule_check(meta)
+        decisions = self.rule_check_all(all_meta)
+        pending = [meta for meta, (decision_type, _) in zip(all_meta, decisions) if decision_type == "PENDING"]
+        ai_results = iter(self.step2_gemini_check_batch(pending))
+        
+        for meta, (decision_type, s1_reason) in zip(all_meta, decisions):
 
             final_status = ""
             filter_stage = ""
@@ -509,7 +772,7 @@ class ImprovedHybridFilterPipeline:
                 
             elif decision_type == "PENDING":
                 filter_stage = "2차 (AI)"
-                ai_res, tokens, cost = self.step2_gemini_check(meta)
+                ai_res, tokens, cost = next(ai_results)
                 
                 if ai_res.upper().startswith("KEEP"):
                     meta.is_core_content = True
@@ -17,8 +17,16 @@ Metadata Generator Node
 """
 
 import os
-import json
+import re
+import hashlib
+import shutil
+import subprocess
 import tempfile
+import time
+import orjson
+import threading
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -47,16 +55,59 @@ except Exception as e:
     OCR_AVAILABLE = False
     ocr_engine = None
 
+
+# 이미지 시그니처 → MIME 타입 (WEBP는 RIFF 컨테이너라 별도 확인)
+_MIME_SIGNATURES = (
+    (b'\xff\xd8', "image/jpeg"),
+    (b'\x89PNG\r\n\x1a\n', "image/png"),
+    (b'GIF87a', "image/gif"),
+    (b'GIF89a', "image/gif"),
+)
+
+# 추출기 이미지 ID 접두사 (PPTX: S01_IMG001, PDF: P01_IMG001) → MAIN_P01_IMG001
+_IMAGE_ID_PREFIX_RE = re.compile(r"^[SP](?=\d)")
+
+# poppler pdftotext가 있으면 보조자료(텍스트만 필요)를 한 번의 프로세스 호출로 추출
+_PDFTOTEXT = shutil.which("pdftotext")
+
+# 이미지 설명 생성(Vision API) 동시 요청 수
+VISION_CONCURRENCY = int(os.getenv("VISION_CONCURRENCY", "8"))
+
 # 기존 노드 임포트
 from .document_converter_node import DocumentConverterNode, DocumentType
 from .improved_hybrid_filter import (
     ImprovedHybridFilterPipeline,
     UniversalImageExtractor,
     ImageMetadata,
-    model
+    presentation_text,
+    OCR_LOCK,
+    PDF_LOCK,
+    get_model
 )
 
 from vertexai.generative_models import Part
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.shapes.graphfrm import GraphicFrame
+
+
+class _Progress:
+    """진행률 한 줄 출력 (최대 약 20Hz로 제한, 마지막 값은 항상 출력)"""
+    
+    def __init__(self, total: int, label: str, min_interval: float = 0.05):
+        self.total = total
+        self.label = label
+        self.min_interval = min_interval
+        self.last = 0.0
+        self.lock = threading.Lock()
+    
+    def update(self, done: int):
+        with self.lock:
+            now = time.monotonic()
+            if done < self.total and now - self.last < self.min_interval:
+                return
+            self.last = now
+            print(f"\r   📝 {self.label} ({done}/{self.total})", end='', flush=True)
 
 
 class TextExtractor:
@@ -91,7 +142,8 @@ class TextExtractor:
             img = Image.open(BytesIO(img_data))
             img_array = np.array(img)
             
-            result = ocr_engine.ocr(img_array, cls=True)
+            with OCR_LOCK:
+                result = ocr_engine.ocr(img_array, cls=True)
             
             if result and result[0]:
                 lines = []
@@ -110,7 +162,8 @@ class TextExtractor:
     def extract_with_markers(
         self, 
         pdf_path: str, 
-        prefix: str = "MAIN"
+        prefix: str = "MAIN",
+        fast_text_only: bool = False
     ) -> Dict[str, Any]:
         """
         PDF에서 페이지별 텍스트 추출 + 마커 삽입
@@ -120,21 +173,31 @@ class TextExtractor:
         Args:
             pdf_path: PDF 파일 경로
             prefix: 페이지 마커 접두사 (MAIN, SUPP1, SUPP2, SUPP3)
+            fast_text_only: pdftotext가 있으면 우선 사용 (OCR이 필요한 페이지가 있으면 기존 방식으로 재추출)
         
         Returns:
             {
                 "full_text": "[MAIN-PAGE 1: 제목]\n내용...",
-                "total_pages": 21
+                "total_pages": 21,
+                "pages": ["페이지별 원문", ...]
             }
         """
+        if fast_text_only and _PDFTOTEXT:
+            result = self._extract_with_pdftotext(pdf_path, prefix)
+            if result is not None:
+                return result
+        
         if PYMUPDF_AVAILABLE:
-            return self._extract_with_pymupdf(pdf_path, prefix)
+            with PDF_LOCK:
+                return self._extract_with_pymupdf(pdf_path, prefix)
         else:
-            return self._extract_with_pdfplumber(pdf_path, prefix)
+            with PDF_LOCK:
+                return self._extract_with_pdfplumber(pdf_path, prefix)
     
     def _extract_with_pymupdf(self, pdf_path: str, prefix: str) -> Dict[str, Any]:
         """PyMuPDF로 텍스트 추출 (OCR 지원)"""
         pages_text = []
+        raw_pages = []
         total_pages = 0
         ocr_count = 0
         
@@ -160,6 +223,7 @@ class TextExtractor:
                     else:
                         print(f"         ⚠️  OCR 실패, 원본 텍스트 사용")
                 
+                raw_pages.append(text)
                 lines = text.split('\n')
                 title = lines[0][:50] if lines and lines[0].strip() else f"Page {page_num + 1}"
                 
@@ -174,16 +238,138 @@ class TextExtractor:
         
         except Exception as e:
             print(f"   ❌ PDF 텍스트 추출 실패: {e}")
-            return {"full_text": "", "total_pages": 0}
+            return {"full_text": "", "total_pages": 0, "pages": []}
         
         return {
             "full_text": "\n".join(pages_text),
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "pages": raw_pages
+        }
+    
+    def extract_from_pptx(self, prs: Presentation, prefix: str = "MAIN") -> Optional[Dict[str, Any]]:
+        """
+        PPTX에서 PDF 변환 없이 슬라이드별 텍스트 추출 (extract_with_markers와 같은 형식)
+        - OCR이 켜져 있고, 텍스트가 부족한 슬라이드에 그림 등 시각 요소가 있으면 None 반환
+          (렌더링된 페이지 OCR이 필요하므로 호출 측에서 PDF 변환 경로 사용)
+        - SmartArt 등 텍스트를 직접 읽을 수 없는 도형이 있어도 None 반환 (변환본에서 추출)
+        """
+        pages_text = []
+        raw_pages = []
+        
+        for page_num, slide in enumerate(prs.slides, 1):
+            texts = []
+            has_visual = self._collect_shape_texts(slide.shapes, texts)
+            if has_visual is None:
+                return None
+            text = "\n".join(texts)
+            
+            if self.ocr_enabled and has_visual and len(text.strip()) < self.min_text_length:
+                return None
+            
+            title_shape = slide.shapes.title
+            if title_shape is not None and title_shape.text.strip():
+                title = title_shape.text.strip()[:50]
+            else:
+                lines = text.split('\n')
+                title = lines[0][:50] if lines and lines[0].strip() else f"Page {page_num}"
+            
+            raw_pages.append(text)
+            pages_text.append(f"[{prefix}-PAGE {page_num}: {title}]")
+            pages_text.append(text)
+            pages_text.append("")
+        
+        return {
+            "full_text": "\n".join(pages_text),
+            "total_pages": len(raw_pages),
+            "pages": raw_pages
+        }
+    
+    def _collect_shape_texts(self, shapes, texts: List[str]) -> Optional[bool]:
+        """
+        도형 목록의 텍스트를 texts에 순서대로 추가 (그룹은 재귀, 표 셀/차트 제목·항목 포함)
+        - 반환: 텍스트가 없는 시각 요소(그림, 차트 등) 포함 여부
+        - 직접 읽을 수 없는 텍스트 도형(SmartArt, OLE 개체 등)이 있으면 None
+        """
+        has_visual = False
+        for shape in shapes:
+            if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+                group_visual = self._collect_shape_texts(shape.shapes, texts)
+                if group_visual is None:
+                    return None
+                has_visual = has_visual or group_visual
+            elif isinstance(shape, GraphicFrame):
+                if shape.has_table:
+                    texts.extend(cell.text for row in shape.table.rows for cell in row.cells if cell.text)
+                elif shape.has_chart:
+                    chart_texts = self._chart_texts(shape.chart)
+                    if chart_texts is None:
+                        return None
+                    texts.extend(chart_texts)
+                    has_visual = True
+                else:
+                    return None
+            elif hasattr(shape, "text"):
+                if shape.text:
+                    texts.append(shape.text)
+            else:
+                has_visual = True
+        return has_visual
+    
+    @staticmethod
+    def _chart_texts(chart) -> Optional[List[str]]:
+        """차트 제목, 계열 이름, 항목 이름 (읽을 수 없는 차트는 None)"""
+        try:
+            texts = []
+            if chart.has_title and chart.chart_title.has_text_frame:
+                title = chart.chart_title.text_frame.text
+                if title:
+                    texts.append(title)
+            for plot in chart.plots:
+                texts.extend(str(series.name) for series in plot.series if series.name)
+                texts.extend(str(category) for category in plot.categories if category)
+            return texts
+        except Exception:
+            return None
+    
+    def _extract_with_pdftotext(self, pdf_path: str, prefix: str) -> Optional[Dict[str, Any]]:
+        """pdftotext(poppler)로 텍스트 추출, 사용할 수 없으면 None 반환"""
+        try:
+            result = subprocess.run(
+                [_PDFTOTEXT, "-enc", "UTF-8", pdf_path, "-"],
+                capture_output=True, check=True, timeout=120
+            )
+        except (subprocess.SubprocessError, OSError) as e:
+            print(f"   ⚠️  pdftotext 실패, 기본 추출기로 대체: {e}")
+            return None
+        
+        # 페이지는 form feed(\x0c)로 구분되며 마지막 요소는 보통 빈 문자열
+        pages = result.stdout.decode("utf-8", "replace").split("\x0c")
+        if pages and not pages[-1].strip():
+            pages.pop()
+        
+        # 스캔본 등 OCR이 필요한 페이지가 있으면 OCR 지원 경로로 넘김
+        if self.ocr_enabled and any(len(text.strip()) < self.min_text_length for text in pages):
+            return None
+        
+        pages_text = []
+        for page_num, text in enumerate(pages, 1):
+            lines = text.split('\n')
+            title = lines[0][:50] if lines and lines[0].strip() else f"Page {page_num}"
+            
+            pages_text.append(f"[{prefix}-PAGE {page_num}: {title}]")
+            pages_text.append(text)
+            pages_text.append("")
+        
+        return {
+            "full_text": "\n".join(pages_text),
+            "total_pages": len(pages),
+            "pages": pages
         }
     
     def _extract_with_pdfplumber(self, pdf_path: str, prefix: str) -> Dict[str, Any]:
         """pdfplumber로 텍스트 추출 (fallback)"""
         pages_text = []
+        raw_pages = []
         total_pages = 0
         
         try:
@@ -192,6 +378,7 @@ class TextExtractor:
                 
                 for page_num, page in enumerate(pdf.pages, 1):
                     text = page.extract_text() or ""
+                    raw_pages.append(text)
                     
                     lines = text.split('\n')
                     title = lines[0][:50] if lines and lines[0].strip() else f"Page {page_num}"
@@ -202,17 +389,93 @@ class TextExtractor:
         
         except Exception as e:
             print(f"   ❌ PDF 텍스트 추출 실패: {e}")
-            return {"full_text": "", "total_pages": 0}
+            return {"full_text": "", "total_pages": 0, "pages": []}
         
         return {
             "full_text": "\n".join(pages_text),
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "pages": raw_pages
         }
 
 
+# 이미지 설명 프롬프트 (문서 내 모든 이미지에 공통, 호출 시 값만 채움)
+_DESC_PROMPT_TEMPLATE = """
+이 이미지를 2-4문장으로 설명하세요.
+
+강의 주제: {keyword_context}
+주변 텍스트: "{adjacent_text}"
+
+설명에 포함할 내용:
+1. 이미지가 나타내는 주제/개념 (1문장)
+2. 주요 구성 요소 2-3개 (1-2문장)
+3. 핵심 정보나 패턴 (1문장)
+
+제외할 내용:
+- 세부 요소 전체 나열
+- 불필요한 추측이나 해석
+
+출력: 명확하고 간결한 2-4문장만.
+"""
+
+_BATCH_DESC_PROMPT_TEMPLATE = """
+강의 주제: {keyword_context}
+
+위 {count}개 이미지 각각을 2-4문장으로 설명하세요.
+
+설명에 포함할 내용:
+1. 이미지가 나타내는 주제/개념 (1문장)
+2. 주요 구성 요소 2-3개 (1-2문장)
+3. 핵심 정보나 패턴 (1문장)
+
+제외할 내용:
+- 세부 요소 전체 나열
+- 불필요한 추측이나 해석
+
+출력: JSON 배열만. 예) [{{"id": 0, "description": "..."}}]
+"""
+
+
 class ImageDescriptionGenerator:
     """통과된 이미지에 대한 상세 설명 생성 (2-4문장)"""
     
+    def __init__(self):
+        # 같은 이미지가 여러 슬라이드에 반복되는 경우 Vision 호출을 재사용
+        self._desc_cache: Dict[bytes, str] = {}
+        self._desc_cache_lock = threading.Lock()
+        # 동시에 들어온 같은 이미지는 먼저 온 요청 결과를 기다렸다가 재사용
+        # 캐시 키 -> [락, 대기/사용 중인 호출 수] (0이 되면 제거해 키가 쌓이지 않음)
+        self._key_locks: Dict[bytes, list] = {}
+    
+    @contextmanager
+    def _key_guard(self, cache_key: bytes):
+        """같은 캐시 키의 설명 생성/저장을 한 번에 하나씩 (같은 스레드의 재진입 허용)"""
+        with self._desc_cache_lock:
+            entry = self._key_locks.get(cache_key)
+            if entry is None:
+                entry = self._key_locks[cache_key] = [threading.RLock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._desc_cache_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[cache_key]
+    
+    @staticmethod
+    def _keyword_context(keywords: List[str]) -> str:
+        return ', '.join(keywords[:10]) if keywords else "일반 학습 내용"
+    
+    @staticmethod
+    def _cache_key(image_bytes: bytes, adjacent_text: str, keywords: List[str]) -> bytes:
+        """이미지 내용 + 프롬프트 문맥(주변 텍스트, 키워드) 기준 캐시 키"""
+        context = f"{adjacent_text}|{','.join(keywords[:10]) if keywords else ''}"
+        return (
+            hashlib.blake2b(image_bytes, digest_size=16).digest()
+            + hashlib.blake2b(context.encode('utf-8'), digest_size=8).digest()
+        )
+    
     def generate_description(
         self, 
         image_bytes: bytes, 
@@ -224,34 +487,36 @@ class ImageDescriptionGenerator:
         Vision API로 이미지 상세 설명 생성
         재시도 로직 포함 (429 Rate Limit 대응)
         """
-        import time
+        cache_key = self._cache_key(image_bytes, adjacent_text, keywords)
+        with self._key_guard(cache_key):
+            cached = self._desc_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            return self._request_description(image_bytes, adjacent_text, keywords, cache_key, max_retries)
+    
+    def _request_description(
+        self,
+        image_bytes: bytes,
+        adjacent_text: str,
+        keywords: List[str],
+        cache_key: bytes,
+        max_retries: int
+    ) -> str:
+        """Vision API 호출 (재시도 포함)"""
+        # 요청 내용은 재시도 사이에 바뀌지 않으므로 한 번만 구성
+        image_part = Part.from_data(data=image_bytes, mime_type=self._get_mime_type(image_bytes))
+        prompt = _DESC_PROMPT_TEMPLATE.format(
+            keyword_context=self._keyword_context(keywords),
+            adjacent_text=adjacent_text
+        )
         
         for attempt in range(max_retries):
             try:
-                mime_type = self._get_mime_type(image_bytes)
-                image_part = Part.from_data(data=image_bytes, mime_type=mime_type)
-                
-                keyword_context = ', '.join(keywords[:10]) if keywords else "일반 학습 내용"
-                
-                prompt = f"""
-이 이미지를 2-4문장으로 설명하세요.
-
-강의 주제: {keyword_context}
-주변 텍스트: "{adjacent_text}"
-
-설명에 포함할 내용:
-1. 이미지가 나타내는 주제/개념 (1문장)
-2. 주요 구성 요소 2-3개 (1-2문장)
-3. 핵심 정보나 패턴 (1문장)
-
-제외할 내용:
-- 세부 요소 전체 나열
-- 불필요한 추측이나 해석
-
-출력: 명확하고 간결한 2-4문장만.
-"""
-                response = model.generate_content([image_part, prompt])
+                response = get_model().generate_content([image_part, prompt])
                 description = response.text.strip()
+                
+                # 성공한 설명만 캐시 (실패 메시지는 다음 호출에서 재시도)
+                self._desc_cache[cache_key] = description
                 return description
                 
             except Exception as e:
@@ -265,22 +530,124 @@ class ImageDescriptionGenerator:
                         print(" 재시도")
                         continue
                     else:
-                        return f"이미지 설명 생성 실패: API rate limit exceeded", 0, 0.0
+                        return f"이미지 설명 생성 실패: API rate limit exceeded"
+                else:
+                    return f"이미지 설명 생성 실패: {error_msg}"
+        
+        return "이미지 설명 생성 실패: Failed after all retries"
+    
+    def generate_descriptions_batch(
+        self,
+        items: List[tuple],
+        keywords: List[str],
+        batch_size: int = 6,
+        max_workers: int = VISION_CONCURRENCY,
+        on_progress=None
+    ) -> List[str]:
+        """
+        이미지 설명 생성 (배치)
+        - items: (image_bytes, adjacent_text) 리스트, 반환은 입력 순서대로 설명 리스트
+        - 캐시에 있거나 중복된 이미지는 요청하지 않고 재사용
+        - batch_size개씩 한 요청에 묶고, 배치끼리는 동시에 요청
+        - 배치 응답이 깨지거나 누락된 이미지는 단건 호출로 폴백
+        """
+        descriptions = [None] * len(items)
+        
+        # 같은 이미지+문맥은 한 번만 요청 (키 → 해당 인덱스 목록)
+        groups: Dict[bytes, List[int]] = {}
+        for idx, (image_bytes, adjacent_text) in enumerate(items):
+            key = self._cache_key(image_bytes, adjacent_text, keywords)
+            cached = self._desc_cache.get(key)
+            if cached is not None:
+                descriptions[idx] = cached
+            else:
+                groups.setdefault(key, []).append(idx)
+        
+        done = len(items) - sum(len(idxs) for idxs in groups.values())
+        if on_progress:
+            on_progress(done)
+        
+        pending = [(key, *items[idxs[0]]) for key, idxs in groups.items()]
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        if not batches:
+            return descriptions
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as pool:
+            keyword_context = self._keyword_context(keywords)
+            futures = {
+                pool.submit(self._describe_batch, batch, keywords, keyword_context): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                for (key, _, _), description in zip(futures[future], future.result()):
+                    for idx in groups[key]:
+                        descriptions[idx] = description
+                    done += len(groups[key])
+                if on_progress:
+                    on_progress(done)
+        
+        return descriptions
+    
+    def _describe_batch(self, batch: List[tuple], keywords: List[str], keyword_context: str) -> List[str]:
+        """(cache_key, image_bytes, adjacent_text) 묶음을 한 요청으로 설명"""
+        if len(batch) == 1:
+            _, image_bytes, adjacent_text = batch[0]
+            return [self.generate_description(image_bytes, adjacent_text, keywords)]
+        
+        # 배치의 모든 키를 정렬 순서로 잡아 단건 호출/다른 배치와 같은 이미지를 중복 요청하지 않음
+        # (정렬 순서로 잡으므로 배치끼리 교착되지 않고, 폴백 단건 호출은 같은 스레드라 재진입)
+        with ExitStack() as stack:
+            for key in sorted(key for key, _, _ in batch):
+                stack.enter_context(self._key_guard(key))
+            
+            # 잠금을 기다리는 동안 다른 호출이 채운 설명은 그대로 사용
+            results = [self._desc_cache.get(key) for key, _, _ in batch]
+            todo = [i for i, cached in enumerate(results) if cached is None]
+            found = self._request_batch([batch[i] for i in todo], keyword_context) if len(todo) > 1 else {}
+            
+            for j, i in enumerate(todo):
+                key, image_bytes, adjacent_text = batch[i]
+                if j in found:
+                    self._desc_cache[key] = found[j]
+                    results[i] = found[j]
                 else:
-                    return f"이미지 설명 생성 실패: {error_msg}", 0, 0.0
+                    results[i] = self.generate_description(image_bytes, adjacent_text, keywords)
+        return results
+    
+    def _request_batch(self, batch: List[tuple], keyword_context: str) -> Dict[int, str]:
+        """여러 이미지를 한 요청으로 설명 → {배치 내 위치: 설명} (깨지거나 누락된 항목은 빠짐)"""
+        parts = []
+        for i, (_, image_bytes, adjacent_text) in enumerate(batch):
+            parts.append(f'[이미지 {i}] 주변 텍스트: "{adjacent_text}"')
+            parts.append(Part.from_data(data=image_bytes, mime_type=self._get_mime_type(image_bytes)))
+        parts.append(_BATCH_DESC_PROMPT_TEMPLATE.format(keyword_context=keyword_context, count=len(batch)))
         
-        return "이미지 설명 생성 실패: Failed after all retries", 0, 0.0
+        try:
+            response = get_model().generate_content(
+                parts,
+                generation_config={"response_mime_type": "application/json"}
+            )
+            
+            found = {}
+            for item in orjson.loads(response.text):
+                description = str(item.get("description", "")).strip()
+                if description:
+                    found[int(item["id"])] = description
+        except Exception as e:
+            print(f"      ⚠️  배치 설명 실패, 개별 생성으로 전환: {e}")
+            found = {}
+        return found
     
     def _get_mime_type(self, image_bytes: bytes) -> str:
         """이미지 바이너리에서 MIME 타입 감지"""
-        if image_bytes.startswith(b'\xff\xd8'):
-            return "image/jpeg"
-        elif image_bytes.startswith(b'\x89PNG\r\n\x1a\n'):
-            return "image/png"
-        elif image_bytes.startswith(b'GIF87a') or image_bytes.startswith(b'GIF89a'):
-            return "image/gif"
-        elif image_bytes.startswith(b'RIFF') and image_bytes[8:12] == b'WEBP':
+        for signature, mime_type in _MIME_SIGNATURES:
+            if image_bytes.startswith(signature):
+                return mime_type
+        if image_bytes.startswith(b'RIFF') and image_bytes.startswith(b'WEBP', 8):
             return "image/webp"
+        
+        # Vision API는 이미지 MIME만 받으므로 기존처럼 PNG로 보내되, 알 수 없는 형식은 드러나게 로그
+        print(f"      ⚠️  알 수 없는 이미지 형식 (시그니처 {image_bytes[:8].hex()}), image/png로 전송")
         return "image/png"
 
 
@@ -296,6 +663,8 @@ class MetadataGenerator:
         self.text_extractor = TextExtractor()
         self.image_filter = ImprovedHybridFilterPipeline(auto_extract_keywords=True)
         self.image_describer = ImageDescriptionGenerator()
+        # PDF 이미지 추출기는 OCR 엔진을 지연 생성해 보관하므로 호출마다 새로 만들지 않고 재사용
+        self.image_extractor = UniversalImageExtractor()
     
     def _extract_page_title(self, slide_title: str, adjacent_text: str) -> str:
         """의미있는 페이지 제목 추출"""
@@ -317,7 +686,28 @@ class MetadataGenerator:
         supplementary_files: Optional[List[str]] = None,
         output_path: str = "output/metadata.json"
     ) -> str:
-        """메타데이터 생성"""
+        """메타데이터 생성 후 JSON 파일로 저장 (CLI/디버깅용)"""
+        metadata = self.generate_data(primary_file, supplementary_files)
+        return self.save(metadata, output_path)
+    
+    def save(self, metadata: Dict[str, Any], output_path: str) -> str:
+        """메타데이터를 JSON 파일로 저장"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # orjson은 UTF-8 bytes로 직렬화 (ensure_ascii=False와 동일한 출력, full_text가 클 때 훨씬 빠름)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+        
+        print(f"📁 출력 파일: {output_path}")
+        return str(output_path)
+    
+    def generate_data(
+        self,
+        primary_file: str,
+        supplementary_files: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """메타데이터 생성 (파일을 거치지 않고 dict로 반환)"""
         print(f"\n{'='*120}")
         print(f"🎯 메타데이터 생성 시작")
         print(f"{'='*120}")
@@ -330,23 +720,33 @@ class MetadataGenerator:
         
         with tempfile.TemporaryDirectory() as temp_dir:
             self.converter = DocumentConverterNode(output_dir=temp_dir)
+            supp_files = (supplementary_files or [])[:3]
             
-            print("📄 [1/3] 주강의자료 처리 중...")
-            primary_metadata = self._process_primary_source(primary_file)
-            
-            print("\n📚 [2/3] 보조자료 처리 중...")
-            supplementary_metadata = []
-            if supplementary_files:
-                for i, supp_file in enumerate(supplementary_files[:3], 1):
-                    try:
-                        supp_meta = self._process_supplementary_source(supp_file, i)
-                        supplementary_metadata.append(supp_meta)
-                        print(f"   ✅ 보조자료 {i} 처리 성공")
-                    except Exception as e:
-                        print(f"   ⚠️ 보조자료 {i} 처리 실패 (계속 진행): {e}")
-                        # 실패해도 다음 보조자료로 넘어감
-            else:
-                print("   ⚠️  보조자료 없음 (선택 사항)")
+            # 보조자료는 주강의자료와 독립적이므로 스레드 풀에서 동시에 처리
+            # (URL 다운로드·LibreOffice 변환·pdftotext는 겹쳐 실행, 프로세스 내 PDF 파싱은 PDF_LOCK으로 직렬화)
+            with ThreadPoolExecutor(max_workers=max(1, len(supp_files))) as executor:
+                supp_futures = [
+                    executor.submit(self._process_supplementary_source, supp_file, i)
+                    for i, supp_file in enumerate(supp_files, 1)
+                ]
+                
+                print("📄 [1/3] 주강의자료 처리 중...")
+                primary_metadata = self._process_primary_source(primary_file)
+                
+                print("\n📚 [2/3] 보조자료 처리 중...")
+                supplementary_metadata = []
+                if supp_futures:
+                    # 입력 순서대로 결과 수집
+                    for i, future in enumerate(supp_futures, 1):
+                        try:
+                            supp_meta = future.result()
+                            supplementary_metadata.append(supp_meta)
+                            print(f"   ✅ 보조자료 {i} 처리 성공")
+                        except Exception as e:
+                            print(f"   ⚠️ 보조자료 {i} 처리 실패 (계속 진행): {e}")
+                            # 실패해도 다음 보조자료로 넘어감
+                else:
+                    print("   ⚠️  보조자료 없음 (선택 사항)")
             
             print("\n🔧 [3/3] 메타데이터 통합 중...")
             metadata = {
@@ -356,16 +756,9 @@ class MetadataGenerator:
                 "supplementary_sources": supplementary_metadata
             }
             
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
-            
             print(f"\n{'='*120}")
             print(f"✅ 메타데이터 생성 완료!")
             print(f"{'='*120}")
-            print(f"📁 출력 파일: {output_path}")
             print(f"📊 주강의자료 페이지: {primary_metadata['total_pages']}개")
             print(f"🖼️  필터링된 이미지: {len(primary_metadata['filtered_images'])}개")
             if supplementary_metadata:
@@ -373,7 +766,7 @@ class MetadataGenerator:
                 print(f"📚 보조자료 페이지: {total_supp_pages}개")
             print(f"{'='*120}\n")
             
-            return str(output_path)
+            return metadata
     
     def _process_primary_source(self, file_path: str) -> Dict[str, Any]:
 
@@ -382,7 +775,6 @@ class MetadataGenerator:
         ✅ TXT/URL 지원 추가 (수정됨)
         """
         file_path_str = str(file_path)
-        # file_path = Path(file_path)
         
         # ✅ 원본 파일 타입 감지 (변환 전)
         if file_path_str.startswith(('http://', 'https://')):
@@ -391,72 +783,99 @@ class MetadataGenerator:
             display_name = file_path_str[:50]
         else:
             file_path_obj = Path(file_path)
-            original_file_type = file_path_obj.suffix.lower().replace('.', '')
+            original_file_type = file_path_obj.suffix[1:].lower()
             display_name = file_path_obj.name
         
         print(f"   📄 파일: {display_name} ({original_file_type})")
         
-        # 1. 파일 변환 (TXT/URL도 PDF로 변환됨)
-        print(f"   🔄 파일 처리 중...")
-        processed_path = self.converter.convert(file_path_str)
-        
-        # ✅ 변환 후 파일은 항상 PDF임!
-        processed_file_type = Path(processed_path).suffix.lower().replace('.', '')
-        
-        # 2. 텍스트 추출
-        print(f"   📝 텍스트 추출 중...")
-        
-        # ✅ TXT/URL이었어도 이제는 PDF가 되었으므로 PDF 처리 로직 사용
-        if original_file_type in ['txt', 'url']:
-            # TXT/URL → PDF 변환됨 → PDF에서 텍스트 추출
-            text_data = self.text_extractor.extract_with_markers(processed_path, prefix="MAIN")
-            print(f"   ✅ 텍스트 추출 완료: {len(text_data['full_text'])}자")
-        else:
-            # 기존 PDF/PPTX/DOCX 처리
-            text_data = self.text_extractor.extract_with_markers(processed_path, prefix="MAIN")
-        
-        # 3. 이미지 필터링
-        print(f"   🖼️  이미지 처리 중...")
-        
         filtered_images = []
         keywords = []
+        all_images = []
         
-        # ✅ TXT/URL은 이미지 없음
-        if original_file_type in ['txt', 'url']:
-            print(f"      → TXT/URL은 이미지 없음, 건너뛰기")
-            all_images = []
-        
-        elif original_file_type == 'pptx':
-            print(f"      → PPTX 원본에서 직접 추출")
-            self.image_filter.extract_keywords_from_document(file_path_str)
-            keywords = self.image_filter.document_keywords
-            all_images = self._extract_images_from_pptx(file_path_str)
+        # 네트워크 대기인 키워드 LLM 호출만 백그라운드에서 실행하고,
+        # 문서 파싱(python-pptx/PyMuPDF/OCR)은 스레드 안전하지 않으므로 이 스레드에서 순서대로 수행
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            keyword_future = None
+            prs = None
             
-        elif original_file_type in ['docx', 'pdf']:
-            print(f"      → PDF에서 이미지 추출")
-            self.image_filter.extract_keywords_from_document(processed_path)
-            keywords = self.image_filter.document_keywords
-            extractor = UniversalImageExtractor()
-            all_images = extractor.extract(processed_path)
-        
-        else:
-            print(f"   ⚠️  지원하지 않는 형식: {original_file_type}")
-            all_images = []
+            text_data = None
+            if original_file_type == 'pptx':
+                # 파싱한 Presentation은 이 스레드에서만 사용 (python-pptx 객체는 스레드 안전하지 않음)
+                # 백그라운드에는 미리 모은 텍스트만 넘겨 키워드 LLM 호출을 수행
+                try:
+                    prs = Presentation(file_path_str)
+                except Exception as e:
+                    print(f"   ⚠️  PPTX 직접 추출 실패: {e}")
+                
+                if prs is not None:
+                    keyword_future = pool.submit(
+                        self.image_filter.extract_keywords_from_text, presentation_text(prs)
+                    )
+                    
+                    # ✅ PPTX는 가능하면 PDF 변환(LibreOffice) 없이 슬라이드 텍스트를 직접 추출
+                    print(f"   📝 PPTX에서 텍스트 직접 추출 중...")
+                    text_data = self.text_extractor.extract_from_pptx(prs, prefix="MAIN")
+                    if text_data is None:
+                        print(f"      → 렌더링이 필요한 슬라이드가 있어 PDF 변환 후 추출")
+            
+            if text_data is None:
+                # 1. 파일 변환 (TXT/URL도 PDF로 변환됨)
+                print(f"   🔄 파일 처리 중...")
+                processed_path = self.converter.convert(file_path_str)
+                
+                # 2. 텍스트 추출
+                print(f"   📝 텍스트 추출 중...")
+                
+                # ✅ TXT/URL이었어도 이제는 PDF가 되었으므로 PDF 처리 로직 사용
+                text_data = self.text_extractor.extract_with_markers(processed_path, prefix="MAIN")
+                if original_file_type in ['txt', 'url']:
+                    print(f"   ✅ 텍스트 추출 완료: {len(text_data['full_text'])}자")
+            
+            # 3. 이미지 필터링
+            print(f"   🖼️  이미지 처리 중...")
+            
+            # ✅ TXT/URL은 이미지 없음
+            if original_file_type in ['txt', 'url']:
+                print(f"      → TXT/URL은 이미지 없음, 건너뛰기")
+            
+            elif original_file_type == 'pptx':
+                print(f"      → PPTX 원본에서 직접 추출")
+                all_images = self.image_extractor.extract(file_path_str, prs=prs)
+                if keyword_future is not None:
+                    keyword_future.result()
+                keywords = self.image_filter.document_keywords
+                
+            elif original_file_type in ['docx', 'pdf']:
+                print(f"      → PDF에서 이미지 추출")
+                # 키워드는 위에서 추출한 페이지 텍스트를 재사용 (LLM 호출은 이미지 추출이 진행되는 동안 수행)
+                keyword_future = pool.submit(
+                    self.image_filter.extract_keywords_from_text, "\n".join(text_data.get('pages', []))
+                )
+                all_images = self.image_extractor.extract(processed_path)
+                keyword_future.result()
+                keywords = self.image_filter.document_keywords
+            
+            else:
+                print(f"   ⚠️  지원하지 않는 형식: {original_file_type}")
         
         # 4. 필터링 실행
         if all_images:
             print(f"   🔍 {len(all_images)}개 이미지 발견, 필터링 시작...")
 
-            for img_meta in all_images:
-                decision, reason = self.image_filter.step1_rule_check(img_meta)
-                
+            decisions = self.image_filter.rule_check_all(all_images)
+            
+            # 2차(AI) 판단 대상은 배치로 한꺼번에 판정 (입력 순서 유지)
+            pending = [m for m, (decision, _) in zip(all_images, decisions) if decision == "PENDING"]
+            ai_results = iter(self.image_filter.step2_gemini_check_batch(pending))
+
+            for img_meta, (decision, reason) in zip(all_images, decisions):
                 if decision == "INCLUDE":
                     img_meta.is_core_content = True
                     img_meta.filter_reason = reason
                     filtered_images.append(img_meta)
                     
                 elif decision == "PENDING":
-                    ai_result = self.image_filter.step2_gemini_check(img_meta)
+                    ai_result = next(ai_results)
 
                     # step2_gemini_check가 (text, tokens, cost) 튜플을 반환하는 경우 대응
                     if isinstance(ai_result, tuple):
@@ -473,32 +892,33 @@ class MetadataGenerator:
         filtered_image_metadata = []
         
         if filtered_images:
+            progress = _Progress(len(filtered_images), "이미지 설명 생성 중...")
             print(f"   📝 이미지 설명 생성 중... (0/{len(filtered_images)})", end='', flush=True)
             
-            for i, img_meta in enumerate(filtered_images, 1):
-                description = self.image_describer.generate_description(
-                    img_meta.image_bytes,
-                    img_meta.adjacent_text,
-                    keywords
-                )
-                
+            # 여러 이미지를 한 요청에 묶고, 배치끼리는 스레드로 동시 요청
+            descriptions = self.image_describer.generate_descriptions_batch(
+                [(img_meta.load_bytes(), img_meta.adjacent_text) for img_meta in filtered_images],
+                keywords,
+                on_progress=progress.update
+            )
+            
+            print()  # 줄바꿈
+            
+            # 결과는 원래 이미지 순서대로 조립
+            for img_meta, description in zip(filtered_images, descriptions):
                 page_title = self._extract_page_title(
                     img_meta.slide_title,
                     img_meta.adjacent_text
                 )
                 
                 filtered_image_metadata.append({
-                    "image_id": img_meta.image_id.replace("S", "MAIN_P").replace("P", "MAIN_P"),
+                    "image_id": _IMAGE_ID_PREFIX_RE.sub("MAIN_P", img_meta.image_id, count=1),
                     "page_number": img_meta.slide_number,
                     "page_title": page_title,
                     "description": description,
                     "filter_stage": "1차 (Rule)" if "Rule" in img_meta.filter_reason else "2차 (AI)",
                     "area_percentage": img_meta.area_percentage
                 })
-                
-                print(f"\r   📝 이미지 설명 생성 중... ({i}/{len(filtered_images)})", end='', flush=True)
-            
-            print()  # 줄바꿈
             
             # ✅ 최종 집계 출력
             print(f"\n   {'='*80}")
@@ -512,7 +932,7 @@ class MetadataGenerator:
         
         return {
             "role": "main",
-            "filename": display_name if original_file_type == 'url' else file_path_obj.name,
+            "filename": display_name,
             "file_type": original_file_type,  # ✅ 원본 타입 저장
             "total_pages": text_data['total_pages'],
             "content": {
@@ -535,7 +955,7 @@ class MetadataGenerator:
             display_name = 'Web Content'
         else:
             file_path_obj = Path(file_path)
-            file_type = file_path_obj.suffix.lower().replace('.', '')
+            file_type = file_path_obj.suffix[1:].lower()
             display_name = file_path_obj.name
         
         print(f"   📚 보조자료 {order}: {display_name} ({file_type})")
@@ -544,7 +964,7 @@ class MetadataGenerator:
         pdf_path = self.converter.convert(file_path_str)  # ✅ 원본 문자열 그대로 전달
         
         print(f"      📝 텍스트 추출 중...")
-        text_data = self.text_extractor.extract_with_markers(pdf_path, prefix=f"SUPP{order}")
+        text_data = self.text_extractor.extract_with_markers(pdf_path, prefix=f"SUPP{order}", fast_text_only=True)
         
         print(f"      ✅ 완료 ({text_data['total_pages']}페이지)")
         
@@ -558,11 +978,6 @@ class MetadataGenerator:
             }
         }
     
-    def _extract_images_from_pptx(self, pptx_path: str) -> List[ImageMetadata]:
-        """PPTX에서 이미지 메타데이터 추출"""
-        extractor = UniversalImageExtractor()
-        return extractor.extract(pptx_path)
-
 
 # CLI 인터페이스
 if __name__ == "__main__":
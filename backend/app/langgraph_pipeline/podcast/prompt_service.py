@@ -1,18 +1,43 @@
 # app/services/podcast/prompt_service.py
+import os
+import time
 import logging
+import threading
 from typing import Dict, Optional, List
 
 logger = logging.getLogger(__name__)
 
+# 템플릿은 거의 바뀌지 않으므로 style_id별로 잠시 캐시 (스크립트 생성마다 Supabase 조회 방지)
+TEMPLATE_CACHE_TTL = float(os.getenv("PROMPT_TEMPLATE_CACHE_TTL", "300"))
+_template_cache: Dict[str, tuple] = {}
+_template_cache_lock = threading.Lock()
+
 class PromptTemplateService:
     """Supabase 기반 프롬프트 템플릿 서비스"""
 
     @staticmethod
     def get_template(supabase_client, style_id: str) -> Optional[Dict]:
         """
-        Supabase에서 style_id로 템플릿 조회
+        Supabase에서 style_id로 템플릿 조회 (TEMPLATE_CACHE_TTL 동안 캐시)
         :param supabase_client: Supabase 클라이언트 객체
         """
+        now = time.monotonic()
+        with _template_cache_lock:
+            entry = _template_cache.get(style_id)
+        if entry and entry[1] > now:
+            return dict(entry[0])
+        
+        template = PromptTemplateService._fetch_template(supabase_client, style_id)
+        
+        # 조회 실패/미존재는 캐시하지 않음 (다음 요청에서 재시도)
+        if template and TEMPLATE_CACHE_TTL > 0:
+            with _template_cache_lock:
+                _template_cache[style_id] = (template, now + TEMPLATE_CACHE_TTL)
+        return dict(template) if template else None
+
+    @staticmethod
+    def _fetch_template(supabase_client, style_id: str) -> Optional[Dict]:
+        """Supabase prompt_templates 테이블 조회"""
         try:
             # Supabase 방식의 쿼리 (SQL 대신 사용)
             response = supabase_client.table("prompt_templates")\
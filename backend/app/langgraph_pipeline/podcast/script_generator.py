@@ -3,44 +3,290 @@
 import json
 import os
 import re
+import hashlib
 import logging
-from google.oauth2 import service_account
+import sqlite3
+import threading
+import time
+import orjson
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator
 from vertexai.generative_models import GenerativeModel
-import vertexai
  
 # [Supabase] 프로젝트 구조에 맞춰 임포트
 from app.services.supabase_service import supabase
 from .prompt_service import PromptTemplateService
+from .utils import iter_turn_spans
+from .vertex_auth import ensure_vertex_init, vertex_init_key
  
 logger = logging.getLogger(__name__)
+
+# Gemini 컨텍스트 캐싱 (opt-in): 큰 소스 텍스트를 서버 측 캐시에 올려두고 재실행 시 재사용
+CONTEXT_CACHE_ENABLED = os.getenv("SCRIPT_CONTEXT_CACHE_ENABLED", "false").lower() == "true"
+CONTEXT_CACHE_MIN_CHARS = int(os.getenv("SCRIPT_CONTEXT_CACHE_MIN_CHARS", "8000"))  # 캐시 최소 토큰 수 미달 방지
+CONTEXT_CACHE_TTL = timedelta(hours=1)
+CONTEXT_CACHE_MAX_ENTRIES = 32
+
+# 캐시 키(blake2b 다이제스트) -> (cached_content 이름, 만료 시각)
+_context_cache_names: dict[bytes, tuple[str, datetime]] = {}
+_context_cache_lock = threading.Lock()
+# 캐시 키 -> 생성 중복 방지용 락 (같은 소스의 동시 요청만 서로 기다림)
+_context_cache_key_locks: dict[bytes, threading.Lock] = {}
+
+
+def _fresh_context_cache_name(key: bytes, now: datetime) -> str | None:
+    """만료까지 여유가 있는 캐시 이름 (_context_cache_lock을 잡은 상태에서 호출)"""
+    entry = _context_cache_names.get(key)
+    # 만료 직전 캐시는 요청 도중 사라질 수 있으므로 여유를 두고 재생성
+    if entry and entry[1] - now > timedelta(minutes=5):
+        return entry[0]
+    return None
+
+# 캐시 사용 시 프롬프트 본문에 소스 대신 들어갈 안내 문구
+_CACHED_SOURCE_REF = "[SOURCE DOCUMENTS: provided above in the cached context]"
+
+# 스크립트 응답 캐시 (opt-in): 동일 입력 재실행 시 LLM 호출 생략
+# temperature 0.7 이라 캐시 적중 시 매번 다른 결과 대신 이전 결과를 재사용함
+SCRIPT_CACHE_ENABLED = os.getenv("SCRIPT_CACHE_ENABLED", "false").lower() == "true"
+SCRIPT_CACHE_DB = os.getenv(
+    "SCRIPT_CACHE_DB",
+    os.path.join(os.path.expanduser("~"), ".cache", "aipods", "script_cache.db"),
+)
+_script_cache_lock = threading.Lock()
+
+
+def _script_cache_key(model_name: str, system_prompt: str, prompt: str, config: dict) -> str:
+    """모델/시스템 프롬프트/최종 프롬프트/생성 설정 기반 캐시 키"""
+    # orjson은 UTF-8 bytes를 바로 반환하므로 별도 encode 없이 해시
+    payload = orjson.dumps(
+        {"model": model_name, "system": system_prompt, "prompt": prompt, "config": config},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _script_cache_connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(SCRIPT_CACHE_DB) or ".", exist_ok=True)
+    conn = sqlite3.connect(SCRIPT_CACHE_DB, timeout=10)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS script_cache "
+        "(key TEXT PRIMARY KEY, title TEXT, script TEXT, created REAL)"
+    )
+    return conn
+
+
+def _script_cache_get(key: str) -> tuple[str, str] | None:
+    """캐시 조회 (실패 시 None)"""
+    try:
+        with _script_cache_lock:
+            conn = _script_cache_connect()
+            try:
+                row = conn.execute(
+                    "SELECT title, script FROM script_cache WHERE key = ?", (key,)
+                ).fetchone()
+            finally:
+                conn.close()
+        return row
+    except sqlite3.Error as e:
+        logger.warning(f"스크립트 캐시 조회 실패: {e}")
+        return None
+
+
+def _script_cache_put(key: str, title: str, script: str) -> None:
+    """캐시 저장 (실패해도 생성 결과에는 영향 없음)"""
+    try:
+        with _script_cache_lock:
+            conn = _script_cache_connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO script_cache VALUES (?, ?, ?, ?)",
+                        (key, title, script, time.time()),
+                    )
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"스크립트 캐시 저장 실패: {e}")
  
  
+# (모델명, 시스템 프롬프트, Vertex 초기화 설정) -> GenerativeModel
+# 노드 실행마다 ScriptGenerator가 새로 만들어지므로 모델은 모듈 단위로 재사용
+_model_cache: dict[tuple, GenerativeModel] = {}
+_model_cache_lock = threading.Lock()
+
+
+def _get_model(model_name: str, system_prompt: str) -> GenerativeModel:
+    """시스템 프롬프트가 적용된 GenerativeModel 재사용 (Vertex 설정이 바뀌면 새로 생성)"""
+    key = (model_name, system_prompt, vertex_init_key())
+    with _model_cache_lock:
+        model = _model_cache.get(key)
+        if model is None:
+            model = GenerativeModel(model_name, system_instruction=system_prompt)
+            _model_cache[key] = model
+    return model
+
+
+# 스트리밍 응답에서 "script" 값 시작 위치
+_SCRIPT_VALUE_START_RE = re.compile(r'"script"\s*:\s*"')
+_JSON_STR_PLAIN_RE = re.compile(r'[^"\\]+')
+_JSON_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class _StreamingScriptTurns:
+    """
+    스트리밍 중인 JSON 응답에서 "script" 문자열 값을 점진적으로 디코딩하고
+    다음 화자 태그가 나타나 완성이 확정된 턴 (speaker, content)을 순서대로 반환
+    - 턴 분할은 TTS와 같은 iter_turn_spans를 사용 (선행 합성 캐시 키가 본 합성과 일치)
+    - 닫는 따옴표에 도달하면 마지막 턴까지 반환
+    """
+
+    def __init__(self):
+        self._pending = ""      # 아직 디코딩하지 않은 원문 (이스케이프가 잘린 경우 대기)
+        self._started = False   # "script": " 이후인지
+        self._done = False      # 닫는 따옴표 도달
+        self._buf = ""          # 마지막으로 완성되지 않은 턴부터의 디코딩된 텍스트
+
+    def feed(self, text: str) -> Iterator[tuple[str, str]]:
+        if self._done:
+            return
+        self._pending += text
+
+        if not self._started:
+            m = _SCRIPT_VALUE_START_RE.search(self._pending)
+            if not m:
+                return
+            self._started = True
+            self._pending = self._pending[m.end():]
+
+        self._buf += self._decode()
+
+        turns = list(iter_turn_spans(self._buf))
+        if self._done:
+            self._buf = ""
+        elif turns:
+            # 마지막 턴은 다음 태그가 나올 때까지 내용이 더 이어질 수 있으므로 보류
+            *turns, (_, tag_start, _) = turns
+            if tag_start is not None:
+                self._buf = self._buf[tag_start:]
+        for speaker, _, content in turns:
+            yield speaker, content
+
+    def _decode(self) -> str:
+        """_pending에서 디코딩 가능한 만큼 JSON 문자열을 풀어서 반환"""
+        s, i, n = self._pending, 0, len(self._pending)
+        out = []
+        while i < n:
+            m = _JSON_STR_PLAIN_RE.match(s, i)
+            if m:
+                out.append(m.group())
+                i = m.end()
+                continue
+            if s[i] == '"':
+                self._done = True
+                break
+            # 백슬래시 이스케이프 (청크 경계에서 잘렸으면 다음 청크까지 대기)
+            if i + 1 >= n:
+                break
+            esc = s[i + 1]
+            if esc == "u":
+                if i + 6 > n:
+                    break
+                # 상위 서로게이트(\ud800-\udbff)면 하위 서로게이트까지 함께 디코딩
+                width = 12 if "d800" <= s[i + 2:i + 6].lower() < "dc00" else 6
+                if i + width > n:
+                    break
+                out.append(json.loads(f'"{s[i:i + width]}"'))
+                i += width
+            else:
+                out.append(_JSON_ESCAPES.get(esc, esc))
+                i += 2
+        self._pending = s[i:]
+        return "".join(out)
+
+
+# _clean_script 정규식 (스크립트마다 호출되므로 모듈 로드 시 한 번만 컴파일)
+_CODE_FENCE_RE = re.compile(r"```(?:python|json|text|markdown)?", re.IGNORECASE)
+_ASTRAL_CHAR_RE = re.compile(r"[\U00010000-\U0010ffff]")
+_BLANK_LINES_RE = re.compile(r"\n\n\n+")
+
+# LLM JSON 응답 정리/폴백용 정규식
+_JSON_FENCE_RE = re.compile(r"```json|```", re.IGNORECASE)
+_TITLE_FALLBACK_RE = re.compile(r'"title"\s*:\s*"([^"]+)"')
+
+# JSON 구조 문자 (중괄호, 따옴표, 이스케이프)만 골라 건너뛰며 스캔
+_JSON_STRUCT_RE = re.compile(r'[{}"\\]')
+
+
+def _find_json_span(text: str) -> tuple[int, int] | None:
+    """
+    첫 번째로 균형이 맞는 {...} 구간의 (시작, 끝) 반환
+    - 문자열 안의 중괄호와 이스케이프(\\", \\\\)는 무시
+    - 뒤에 설명 문장이나 다른 객체가 붙어 있어도 첫 객체에서 멈춤
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    depth = 0
+    in_str = False
+    escaped_at = -1
+    for m in _JSON_STRUCT_RE.finditer(text, start):
+        i = m.start()
+        if i == escaped_at:
+            continue
+        c = text[i]
+        if in_str:
+            if c == "\\":
+                escaped_at = i + 1
+            elif c == '"':
+                in_str = False
+        elif c == '"':
+            in_str = True
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return start, i + 1
+    return None
+
+
+def _loads_llm_json(json_text: str):
+    """
+    orjson으로 먼저 파싱하고, 실패하면 문자열 안의 이스케이프되지 않은 줄바꿈 등
+    제어 문자를 허용하는 표준 파서(strict=False)로 한 번 더 시도
+    """
+    try:
+        return orjson.loads(json_text)
+    except orjson.JSONDecodeError:
+        return json.loads(json_text, strict=False)
+
+
 def _extract_json_from_llm(text: str) -> dict:
     """
     LLM 출력에서 JSON만 안전하게 추출
     - ```json 코드블록 제거
-    - 가장 바깥 {} 블록 추출
+    - 첫 번째 균형 잡힌 {} 블록 추출
     """
     # 1. 코드블록 마크다운 제거 (```json, ```)
-    cleaned = re.sub(r"```json|```", "", text, flags=re.IGNORECASE).strip()
+    cleaned = _JSON_FENCE_RE.sub("", text).strip()
  
-    # 2. 가장 바깥쪽 중괄호 {} 찾기
-    match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-    if not match:
+    # 2. 첫 번째 균형 잡힌 중괄호 {} 블록 찾기
+    span = _find_json_span(cleaned)
+    if span is None:
         # JSON 블록을 못 찾았을 경우, 텍스트 전체가 JSON일 수도 있으니 시도
         try:
-            return json.loads(cleaned)
+            return _loads_llm_json(cleaned)
         except:
             raise ValueError("LLM 출력에서 JSON 블록을 찾을 수 없습니다.")
  
-    json_text = match.group().strip()
-    return json.loads(json_text)
+    return _loads_llm_json(cleaned[span[0]:span[1]])
  
 def _extract_title_fallback(text: str) -> str | None:
     """
     JSON 파싱 실패 시 title만 정규식으로 추출
     """
-    match = re.search(r'"title"\s*:\s*"([^"]+)"', text)
+    match = _TITLE_FALLBACK_RE.search(text)
     if match:
         return match.group(1).strip()
     return None
@@ -59,36 +305,8 @@ class ScriptGenerator:
         self._load_prompt_template()
    
     def _init_vertex_ai(self):
-        """Vertex AI 초기화"""
-       
-        # [중요] 401 인증 오류 방지를 위한 환경 변수 강제 설정
-        if self.sa_file and os.path.exists(self.sa_file):
-            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = self.sa_file
-            logger.info(f"인증 파일 환경변수 설정 완료: {self.sa_file}")
- 
-        credentials = self._load_credentials()
-       
-        try:
-            vertexai.init(
-                project=self.project_id,
-                location=self.region,
-                credentials=credentials
-            )
-            logger.info(f"Vertex AI 초기화 완료: {self.project_id} / {self.region}")
-        except Exception as e:
-            logger.error(f"Vertex AI 초기화 실패: {e}")
-            raise
-   
-    def _load_credentials(self):
-        """서비스 계정 인증 정보 로드"""
-        if os.path.exists(self.sa_file):
-            try:
-                return service_account.Credentials.from_service_account_file(self.sa_file)
-            except Exception as e:
-                raise RuntimeError(f"서비스 계정 파일 로드 오류: {e}")
-        else:
-            logger.warning(f"서비스 계정 파일을 찾을 수 없습니다: {self.sa_file}")
-            return None
+        """Vertex AI 초기화 (프로세스 내 최초 1회)"""
+        ensure_vertex_init(self.project_id, self.region, self.sa_file)
    
     def _load_prompt_template(self):
         """프롬프트 템플릿 로드 (Supabase 연동)"""
@@ -120,34 +338,82 @@ class ScriptGenerator:
         guest_name: str,
         duration: int = 5,              # 기본값 5분
         difficulty: str = "intermediate", # 난이도 설정 (basic, intermediate, advanced)
-        user_prompt: str = ""           # 사용자 추가 요청
+        user_prompt: str = "",          # 사용자 추가 요청
+        on_turn: Callable[[str, str], None] | None = None  # 스트리밍 중 완성된 화자 턴 콜백
     ) -> dict:
-        """팟캐스트 스크립트 생성"""
+        """
+        팟캐스트 스크립트 생성
+        - on_turn 지정 시 스트리밍으로 생성하며 완성된 (화자, 내용) 턴을 즉시 전달 (TTS 선행 합성용)
+        """
         # 환경 변수에서 모델명 가져오기 (기본값: gemini-2.0-flash-exp)
         model_name = os.getenv("VERTEX_AI_MODEL_TEXT", "gemini-2.0-flash-exp")
        
         logger.info(f"모델 사용: {model_name} / 목표 시간: {duration}분 / 난이도: {difficulty} / 스타일: {self.style}")
        
-        # 시스템 프롬프트와 함께 모델 생성
-        model = GenerativeModel(
-            model_name,
-            system_instruction=self.system_prompt
-        )
-       
-        # 프롬프트 생성 (시간 + 난이도 + 사용자 요청 포함)
-        final_prompt = self._create_prompt(combined_text, host_name, guest_name, duration, difficulty, user_prompt)
-       
         config = {
             "max_output_tokens": 8192,
             "temperature": 0.7,
         }
+
+        # 동일 입력 캐시 조회 (컨텍스트 캐시 여부와 무관하게 원본 프롬프트 기준)
+        cache_key = None
+        full_prompt = None
+        if SCRIPT_CACHE_ENABLED:
+            full_prompt = self._create_prompt(combined_text, host_name, guest_name, duration, difficulty, user_prompt)
+            cache_key = _script_cache_key(model_name, self.system_prompt, full_prompt, config)
+            cached = _script_cache_get(cache_key)
+            if cached:
+                title, script_text = cached
+                logger.info(f"스크립트 캐시 적중 → LLM 호출 생략 (제목: {title})")
+                return {
+                    "title": title,
+                    "script": script_text,
+                    "usage": {
+                        "script_generation": {
+                            "input_tokens": 0,
+                            "output_tokens": 0,
+                            "total_tokens": 0,
+                            "cost_usd": 0.0,
+                            "cached": True
+                        }
+                    }
+                }
+       
+        # 컨텍스트 캐시 사용 가능하면 소스 텍스트는 캐시에서, 프롬프트에는 지시사항만 전달
+        model = self._get_cached_model(model_name, combined_text)
+        if model is not None:
+            final_prompt = self._create_prompt(
+                _CACHED_SOURCE_REF, host_name, guest_name, duration, difficulty, user_prompt
+            )
+        else:
+            # 시스템 프롬프트가 적용된 모델 (프로세스 내 재사용)
+            model = _get_model(model_name, self.system_prompt)
+           
+            # 프롬프트 생성 (시간 + 난이도 + 사용자 요청 포함, 캐시 키 계산 시 만든 것이 있으면 재사용)
+            final_prompt = full_prompt or self._create_prompt(
+                combined_text, host_name, guest_name, duration, difficulty, user_prompt
+            )
        
         try:
             logger.info("LLM 스크립트 생성 요청 중...")
-            response = model.generate_content(final_prompt, generation_config=config)
+            if on_turn is not None:
+                response = None
+                raw_text, usage_metadata = self._generate_streaming(model, final_prompt, config, on_turn)
+            else:
+                response = model.generate_content(final_prompt, generation_config=config)
+                usage_metadata = response.usage_metadata
+               
+                # [핵심 수정 부분] response.text 대신 Parts를 순회하며 텍스트 추출
+                text_parts = []
+                if response.candidates:
+                    candidate = response.candidates[0]
+                    if hasattr(candidate.content, 'parts'):
+                        for part in candidate.content.parts:
+                            if part.text:
+                                text_parts.append(part.text)
+                raw_text = "".join(text_parts)
            
             # 토큰 추출 코드
-            usage_metadata = response.usage_metadata
             input_tokens = usage_metadata.prompt_token_count
             output_tokens = usage_metadata.candidates_token_count
             total_tokens = usage_metadata.total_token_count
@@ -162,15 +428,6 @@ class ScriptGenerator:
             logger.info(f"📊 [스크립트 생성] 토큰: {input_tokens:,} in / {output_tokens:,} out / {total_tokens:,} total")
             logger.info(f"💰 [스크립트 생성] 비용: ${total_cost:.6f} (입력: ${input_cost:.6f} / 출력: ${output_cost:.6f})")
 
-            # [핵심 수정 부분] response.text 대신 Parts를 순회하며 텍스트 추출
-            raw_text = ""
-            if response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate.content, 'parts'):
-                    for part in candidate.content.parts:
-                        if part.text:
-                            raw_text += part.text
-           
             if not raw_text:
                 logger.error(f"모델 응답 텍스트 없음. 응답 객체: {response}")
                 raise RuntimeError("모델이 빈 텍스트를 반환했습니다. (Safety Filter 가능성)")
@@ -196,6 +453,9 @@ class ScriptGenerator:
  
             logger.info(f"제목 생성 완료: {title}")
             logger.info(f"스크립트 길이: {len(script_text)}자")
+
+            if cache_key and script_text:
+                _script_cache_put(cache_key, title, script_text)
  
             return {
                 "title": title,
@@ -214,14 +474,100 @@ class ScriptGenerator:
             logger.error(f"스크립트 생성 오류: {e}", exc_info=True)
             raise RuntimeError(f"스크립트 생성 실패: {str(e)}") from e
    
-    def _create_prompt(self, combined_text: str, host_name: str, guest_name: str, duration: int, difficulty: str, user_prompt: str = "") -> str:
-        """템플릿을 사용해 프롬프트 생성"""
-       
-        # 1. 소스 텍스트 길이 제한 (6만자로 상향)
+    def _generate_streaming(self, model, prompt: str, config: dict, on_turn: Callable[[str, str], None]):
+        """스트리밍 생성: 전체 텍스트를 모으면서 완성된 화자 턴을 on_turn으로 전달"""
+        pieces = []
+        usage_metadata = None
+        turns = _StreamingScriptTurns()
+        
+        for chunk in model.generate_content(prompt, generation_config=config, stream=True):
+            # 사용량은 마지막 청크에 누적값으로 들어옴
+            usage_metadata = chunk.usage_metadata
+            if not chunk.candidates or not hasattr(chunk.candidates[0].content, 'parts'):
+                continue
+            for part in chunk.candidates[0].content.parts:
+                if not part.text:
+                    continue
+                pieces.append(part.text)
+                try:
+                    for speaker, content in turns.feed(part.text):
+                        on_turn(speaker, content)
+                except Exception as e:
+                    # 선행 처리 실패는 본 생성 결과에 영향을 주지 않음
+                    logger.warning(f"스트리밍 턴 전달 실패: {e}")
+        
+        return "".join(pieces), usage_metadata
+
+    def _get_cached_model(self, model_name: str, combined_text: str):
+        """
+        소스 텍스트를 Vertex AI 컨텍스트 캐시에 올린 모델 반환
+        - SCRIPT_CONTEXT_CACHE_ENABLED=true 일 때만 동작
+        - 같은 (모델, 시스템 프롬프트, 소스) 조합은 만료 전까지 기존 캐시 재사용
+        - 실패 시 None (일반 경로로 폴백)
+        """
+        if not CONTEXT_CACHE_ENABLED or len(combined_text) < CONTEXT_CACHE_MIN_CHARS:
+            return None
+
+        source_text = self._truncate_source(combined_text)
+        # 프로세스 내 조회용 키이므로 짧은 blake2b 다이제스트면 충분 (hex 문자열 생성 생략)
+        key = hashlib.blake2b(
+            f"{model_name}\0{self.system_prompt}\0{source_text}".encode("utf-8"),
+            digest_size=16
+        ).digest()
+
+        try:
+            from vertexai.preview import caching
+            from vertexai.preview.generative_models import GenerativeModel as PreviewGenerativeModel
+
+            now = datetime.now(timezone.utc)
+            with _context_cache_lock:
+                cache_name = _fresh_context_cache_name(key, now)
+                key_lock = _context_cache_key_locks.setdefault(key, threading.Lock())
+
+            if cache_name is None:
+                # 생성(네트워크 호출)은 전역 락 밖에서 수행, 같은 소스의 동시 요청만 키별 락으로 한 번 생성
+                with key_lock:
+                    with _context_cache_lock:
+                        cache_name = _fresh_context_cache_name(key, now)
+                    if cache_name is None:
+                        cached_content = caching.CachedContent.create(
+                            model_name=model_name,
+                            system_instruction=self.system_prompt,
+                            contents=[source_text],
+                            ttl=CONTEXT_CACHE_TTL,
+                        )
+                        with _context_cache_lock:
+                            if key not in _context_cache_names and len(_context_cache_names) >= CONTEXT_CACHE_MAX_ENTRIES:
+                                evicted = next(iter(_context_cache_names))
+                                _context_cache_names.pop(evicted)
+                                _context_cache_key_locks.pop(evicted, None)
+                            _context_cache_names[key] = (cached_content.resource_name, now + CONTEXT_CACHE_TTL)
+                        logger.info(f"컨텍스트 캐시 생성: {cached_content.resource_name}")
+                        return PreviewGenerativeModel.from_cached_content(cached_content=cached_content)
+
+            cached_content = caching.CachedContent(cached_content_name=cache_name)
+            logger.info(f"컨텍스트 캐시 재사용: {cache_name}")
+            return PreviewGenerativeModel.from_cached_content(cached_content=cached_content)
+        except Exception as e:
+            logger.warning(f"컨텍스트 캐시 사용 실패 → 일반 요청으로 진행: {e}")
+            with _context_cache_lock:
+                _context_cache_names.pop(key, None)
+                _context_cache_key_locks.pop(key, None)
+            return None
+
+    def _truncate_source(self, combined_text: str) -> str:
+        """소스 텍스트 길이 제한 (6만자로 상향)"""
         max_text_length = 60000
         if len(combined_text) > max_text_length:
             logger.warning(f"텍스트가 너무 깁니다 ({len(combined_text)}자). {max_text_length}자로 제한합니다.")
             combined_text = combined_text[:max_text_length] + "\n\n[... truncated ...]"
+        return combined_text
+
+    def _create_prompt(self, combined_text: str, host_name: str, guest_name: str, duration: int, difficulty: str, user_prompt: str = "") -> str:
+        """템플릿을 사용해 프롬프트 생성"""
+       
+        # 1. 소스 텍스트 길이 제한
+        combined_text = self._truncate_source(combined_text)
        
         # 2. [수정] 시간(분) 기반 글자 수 계산 - 스타일에 따른 분기 처리
         if self.style == "lecture":
@@ -286,18 +632,14 @@ class ScriptGenerator:
    
     def _clean_script(self, script_text: str) -> str:
         """스크립트 텍스트 정리"""
-        # 코드블록 제거
-        script_text = re.sub(
-            r"```python|```json|```text|```|```markdown",
-            "",
-            script_text,
-            flags=re.IGNORECASE
-        )
+        # 코드블록 제거 (펜스가 없으면 패스 생략)
+        if "```" in script_text:
+            script_text = _CODE_FENCE_RE.sub("", script_text)
         # 이모지 등 4바이트 문자 제거 (DB 저장 오류 방지), 단 *나 #은 유지 (강조용)
-        script_text = re.sub(r"[\U00010000-\U0010ffff]", "", script_text)
+        script_text = _ASTRAL_CHAR_RE.sub("", script_text)
        
-        # 과도한 줄바꿈 정리
-        script_text = re.sub(r'\n{3,}', '\n\n', script_text)
-        script_text = re.sub(r'\n+$', '', script_text)
+        # 과도한 줄바꿈 정리 (끝부분 줄바꿈은 strip()이 함께 제거)
+        if "\n\n\n" in script_text:
+            script_text = _BLANK_LINES_RE.sub("\n\n", script_text)
        
         return script_text.strip()
\ No newline at end of file
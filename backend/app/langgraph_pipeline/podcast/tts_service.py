@@ -1,24 +1,76 @@
 # app/services/podcast/tts_service.py
 import os
 import re
-import time
 import uuid
+import random
+import asyncio
+import hashlib
+import json
 import logging
-import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from functools import lru_cache
 from typing import List, Dict, Any
 from vertexai.generative_models import GenerativeModel
-from .utils import sanitize_tts_text, chunk_text, base64_to_bytes, pcm_to_wav
+from .utils import sanitize_tts_text, chunk_text, base64_to_bytes, write_wav, pitch_shift_pcm, iter_turn_spans
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 5           
 BASE_DELAY = 1.0          
-INTER_CHUNK_DELAY = 1.0   
-SPEAKER_TURN_DELAY = 0.5  
+QUOTA_BASE_DELAY = 10.0   # 429(쿼터 초과) 시 최소 대기
+MAX_BACKOFF = 60.0
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "8"))  # 동시 TTS 요청 수 (쿼터 보호)
+# 요청 1회당 최대 글자 수: 청크가 클수록 왕복 횟수가 줄어듦 (문장 경계는 유지)
+TTS_CHUNK_MAX_CHARS = int(os.getenv("TTS_CHUNK_MAX_CHARS", "500"))
+
+# Gemini TTS 출력 PCM 포맷: 24kHz / 16bit / mono
+TTS_SAMPLE_RATE = 24000
+TTS_SAMPLE_WIDTH = 2
+TTS_CHANNELS = 1
+_PCM_BYTES_PER_SEC = TTS_SAMPLE_RATE * TTS_SAMPLE_WIDTH * TTS_CHANNELS
+
+TTS_MODEL_NAME = "gemini-2.5-flash-preview-tts"
 
 FIXED_STUDENT_VOICE = "Leda"
 STUDENT_PITCH_FACTOR = 1.15
 
+# 화자 태그에 포함되면 해당 역할로 판단하는 키워드
+_HOST_ROLES = ("선생", "진행", "teacher", "host")
+_STUDENT_ROLES = ("학생", "게스트", "student", "guest")
+
+# 파일명용 화자 이름 정리
+_UNSAFE_SPEAKER_RE = re.compile(r"[^a-zA-Z0-9가-힣]")
+
+# 청크 단위 TTS 결과(PCM) 디스크 캐시 (opt-in): (모델, 생성 설정, 텍스트)가 같으면 API 호출 생략
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "false").lower() == "true"
+TTS_CACHE_DIR = os.getenv(
+    "TTS_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "aipods", "tts"),
+)
+# 캐시 상한: 오래된 파일은 미적중 처리, 총 용량을 넘으면 오래된 것부터 삭제
+TTS_CACHE_MAX_AGE = float(os.getenv("TTS_CACHE_MAX_AGE_HOURS", "168")) * 3600
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_MB", "1024")) * 1024 * 1024
+_CACHE_PRUNE_INTERVAL = 600.0  # 디렉토리 정리는 최대 10분에 한 번
+_cache_pruned_at = 0.0
+_cache_prune_lock = threading.Lock()
+
+# 스크립트 스트리밍 중 완성된 화자 턴을 미리 합성해 캐시에 채워 둠 (opt-in, TTS_CACHE_ENABLED 필요)
+# 최종 스크립트 파싱/정리 전에 유료 합성을 요청하므로, 실패하거나 내용이 바뀐 턴의 비용은 낭비될 수 있음
+TTS_PREFETCH_ENABLED = os.getenv("TTS_PREFETCH_ENABLED", "false").lower() == "true"
+_prefetch_executor: ThreadPoolExecutor | None = None  # 선행 합성을 처음 요청할 때 생성
+_prefetch_inflight: Dict[str, Future] = {}  # 캐시 경로 -> 진행 중인 선행 합성
+_prefetch_lock = threading.Lock()
+
+
+def _get_prefetch_executor() -> ThreadPoolExecutor:
+    """선행 합성 스레드 풀 (_prefetch_lock을 잡은 상태에서 호출, import만으로는 스레드를 만들지 않음)"""
+    global _prefetch_executor
+    if _prefetch_executor is None:
+        _prefetch_executor = ThreadPoolExecutor(max_workers=TTS_CONCURRENCY, thread_name_prefix="tts-prefetch")
+    return _prefetch_executor
+
 
 def get_wav_output_dir() -> str:
     """환경에 맞는 WAV 출력 디렉토리 반환"""
@@ -26,11 +78,155 @@ def get_wav_output_dir() -> str:
     return os.path.join(base, "podcasts", "wav")
 
 
+def _tts_cache_path(voice_name: str, text: str) -> str:
+    # 모델/생성 설정이 바뀌면 이전 음성을 재사용하지 않도록 키에 포함 (voice는 설정 안에 들어 있음)
+    config = json.dumps(_tts_config(voice_name), sort_keys=True)
+    digest = hashlib.sha256(f"{TTS_MODEL_NAME}|{config}|{text}".encode("utf-8")).hexdigest()
+    return os.path.join(TTS_CACHE_DIR, f"{digest}.pcm")
+
+
+def _read_tts_cache(path: str) -> bytes | None:
+    """캐시된 PCM 반환 (없거나 비어 있거나 보관 기간이 지났으면 None)"""
+    try:
+        if time.time() - os.path.getmtime(path) > TTS_CACHE_MAX_AGE:
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        return data or None
+    except OSError:
+        return None
+
+
+def _prune_tts_cache() -> None:
+    """보관 기간이 지난 파일을 지우고, 총 용량이 상한을 넘으면 오래된 파일부터 삭제"""
+    global _cache_pruned_at
+    now = time.time()
+    if now - _cache_pruned_at < _CACHE_PRUNE_INTERVAL or not _cache_prune_lock.acquire(blocking=False):
+        return
+    try:
+        _cache_pruned_at = now
+        entries = []
+        with os.scandir(TTS_CACHE_DIR) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".pcm"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            if now - mtime <= TTS_CACHE_MAX_AGE and total <= TTS_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+    except OSError as e:
+        logger.warning(f"TTS 캐시 정리 실패: {e}")
+    finally:
+        _cache_prune_lock.release()
+
+
+def _write_tts_cache(path: str, pcm_bytes: bytes) -> None:
+    """임시 파일에 쓴 뒤 os.replace로 원자적 교체 (동시 쓰기에도 깨진 파일 없음)"""
+    try:
+        os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pcm_bytes)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"TTS 캐시 저장 실패: {e}")
+        return
+    _prune_tts_cache()
+
+
+_tts_model: GenerativeModel | None = None
+_tts_model_lock = threading.Lock()
+
+
+def _get_tts_model() -> GenerativeModel:
+    """TTS 모델은 프로세스에서 한 번만 생성해 공유 (최초 사용 시 지연 생성)"""
+    global _tts_model
+    if _tts_model is None:
+        with _tts_model_lock:
+            if _tts_model is None:
+                _tts_model = GenerativeModel(TTS_MODEL_NAME)
+    return _tts_model
+
+
+@lru_cache(maxsize=8)
+def _tts_config(voice_name: str) -> Dict[str, Any]:
+    """voice별 생성 설정 (요청/재시도마다 다시 만들지 않음, 호출 측에서 수정 금지)"""
+    return {
+        "response_modalities": ["AUDIO"],
+        "speech_config": {
+            "voice_config": {
+                "prebuilt_voice_config": {"voice_name": voice_name},
+            }
+        }
+    }
+
+
+@lru_cache(maxsize=64)
+def _resolve_voice(speaker_tag: str, host_name: str) -> tuple[str, bool]:
+    """화자 태그 → (voice_name, is_student)"""
+    if any(role in speaker_tag for role in _HOST_ROLES):
+        return host_name, False
+    if any(role in speaker_tag for role in _STUDENT_ROLES):
+        return FIXED_STUDENT_VOICE, True
+    return host_name, False
+
+
+def _backoff_delay(base: float, attempt: int) -> float:
+    """지터를 섞은 지수 백오프 (동시에 실패한 요청들이 같은 시점에 재시도하지 않도록)"""
+    return min(MAX_BACKOFF, random.uniform(base, base * 3 * (2 ** attempt)))
+
+
+class _QuotaGate:
+    """
+    429 발생 시 모든 청크의 새 요청을 멈추는 공유 게이트
+    - 재개 시각은 요청된 대기 중 가장 늦은 시각으로만 늘어남 (먼저 깬 작업이 게이트를 일찍 열지 않음)
+    """
+    
+    def __init__(self):
+        self._resume_at = 0.0
+    
+    def block_for(self, seconds: float) -> None:
+        now = asyncio.get_running_loop().time()
+        self._resume_at = max(self._resume_at, now + seconds)
+    
+    async def wait(self) -> None:
+        loop = asyncio.get_running_loop()
+        while (remaining := self._resume_at - loop.time()) > 0:
+            await asyncio.sleep(remaining)
+
+
+def _iter_turns(script: str):
+    """스크립트를 (화자 태그, 내용) 턴으로 순회 (분할 규칙은 utils.iter_turn_spans)"""
+    for speaker_tag, _, content in iter_turn_spans(script):
+        yield speaker_tag, content
+
+
+def _iter_turn_chunks(speaker_tag: str, raw_content: str, host_name: str, guest_name: str | None):
+    """화자 턴 하나를 (정리된 텍스트, voice, chunk_index, is_student) 청크로 분할"""
+    voice_name, is_student = _resolve_voice(speaker_tag, host_name)
+    
+    for chunk_index, content in enumerate(chunk_text(raw_content, max_chars=TTS_CHUNK_MAX_CHARS)):
+        sanitized_content = sanitize_tts_text(content, host_name, guest_name)
+        
+        if not sanitized_content:
+            continue
+        
+        yield sanitized_content, voice_name, chunk_index, is_student
+
+
 class TTSService:
     """Vertex AI TTS 서비스"""
     
     def __init__(self):
-        self.model = GenerativeModel("gemini-2.5-flash-preview-tts") 
+        self.model = _get_tts_model()
     
     def generate_audio(
         self, 
@@ -38,67 +234,97 @@ class TTSService:
         host_name: str, 
         guest_name: str | None = None
     ) -> tuple[List[Dict[str, Any]], List[str]]:
-        """스크립트를 TTS로 변환"""
+        """동기 진입점 (스크립트/CLI용, 실행 중인 이벤트 루프 안에서는 agenerate_audio 사용)"""
+        return asyncio.run(self.agenerate_audio(script, host_name, guest_name))
+    
+    async def agenerate_audio(
+        self, 
+        script: str, 
+        host_name: str, 
+        guest_name: str | None = None
+    ) -> tuple[List[Dict[str, Any]], List[str]]:
+        """스크립트를 TTS로 변환 (청크 단위 병렬 처리)"""
         logger.info(f"TTS 변환 시작 - 선생님: {host_name}, 학생: {FIXED_STUDENT_VOICE} (Pitch x{STUDENT_PITCH_FACTOR})")
         
-        audio_metadata = []
-        segments = re.split(r"\[([^\]]+)\]", script)
+        base_filename = f"podcast_temp_{uuid.uuid4().hex[:4]}"
         
-        if len(segments) <= 1:
-            segments = ["", "선생님", script]
+        # 1. 모든 청크를 작업 목록으로 먼저 구성 (순서 = 인덱스)
+        tasks = []
         
-        base_filename = f"podcast_temp_{uuid.uuid4().hex[:4]}"
-        i = 1
-        
-        while i < len(segments):
-            speaker_tag = segments[i].strip()
-            raw_content = segments[i + 1].strip()
-            i += 2
-            
-            if not raw_content:
-                continue
-            
-            content_chunks = chunk_text(raw_content, max_chars=200)
-            
-            for chunk_index, content in enumerate(content_chunks):
-                sanitized_content = sanitize_tts_text(content, host_name, guest_name)
-                
-                if not sanitized_content:
+        for speaker_tag, raw_content in _iter_turns(script):
+            for sanitized_content, voice_name, chunk_index, is_student in _iter_turn_chunks(
+                speaker_tag, raw_content, host_name, guest_name
+            ):
+                tasks.append((sanitized_content, voice_name, speaker_tag, len(tasks), chunk_index, is_student))
+        
+        # 2. 세마포어로 동시 요청 수를 제한하며 병렬 생성 (gather는 입력 순서 유지)
+        results = await self._generate_all(tasks, base_filename)
+        
+        audio_metadata = [m for m in results if m]
+        wav_files = [m['file'] for m in audio_metadata]
+        logger.info(f"TTS 변환 완료: 총 {len(wav_files)}개 파일 (요청 {len(tasks)}개, 동시성 {TTS_CONCURRENCY})")
+        
+        return audio_metadata, wav_files
+    
+    def prefetch_turn(
+        self,
+        speaker_tag: str,
+        raw_content: str,
+        host_name: str,
+        guest_name: str | None = None
+    ) -> None:
+        """
+        스크립트 생성 도중 완성된 화자 턴을 백그라운드에서 미리 합성
+        - 결과는 디스크 캐시에 저장되어 generate_audio에서 그대로 재사용
+        - 실패해도 generate_audio 단계에서 정상 경로로 다시 생성
+        """
+        if not (TTS_CACHE_ENABLED and TTS_PREFETCH_ENABLED):
+            return
+        
+        raw_content = raw_content.strip()
+        if not raw_content:
+            return
+        
+        for text, voice_name, _, _ in _iter_turn_chunks(speaker_tag.strip(), raw_content, host_name, guest_name):
+            cache_path = _tts_cache_path(voice_name, text)
+            with _prefetch_lock:
+                if cache_path in _prefetch_inflight or os.path.exists(cache_path):
                     continue
-                
-                voice_name = host_name
-                is_student = False
-                
-                if any(role in speaker_tag for role in ["선생", "진행", "teacher", "host"]):
-                    voice_name = host_name
-                elif any(role in speaker_tag for role in ["학생", "게스트", "student", "guest"]):
-                    voice_name = FIXED_STUDENT_VOICE
-                    is_student = True
-                
-                audio_file = self._generate_single_audio(
-                    sanitized_content,
+                _prefetch_inflight[cache_path] = _get_prefetch_executor().submit(
+                    self._prefetch_chunk, text, voice_name, cache_path
+                )
+    
+    def _prefetch_chunk(self, text: str, voice_name: str, cache_path: str) -> None:
+        try:
+            _write_tts_cache(cache_path, self._request_pcm(text, voice_name))
+        except Exception as e:
+            logger.warning(f"TTS 선행 합성 실패 (본 단계에서 재시도): {e}")
+        finally:
+            with _prefetch_lock:
+                _prefetch_inflight.pop(cache_path, None)
+    
+    async def _generate_all(self, tasks: List[tuple], base_filename: str) -> List[Dict[str, Any] | None]:
+        """모든 청크를 최대 TTS_CONCURRENCY개씩 동시에 생성"""
+        semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+        quota_gate = _QuotaGate()
+        
+        async def run(task):
+            text, voice_name, speaker, index, chunk_index, is_student = task
+            async with semaphore:
+                return await self._generate_single_audio(
+                    text,
                     voice_name,
-                    speaker_tag,
+                    speaker,
                     base_filename,
-                    len(audio_metadata),
+                    index,
                     chunk_index,
-                    is_student=is_student
+                    is_student=is_student,
+                    quota_gate=quota_gate
                 )
-                
-                if audio_file:
-                    audio_metadata.append(audio_file)
-                
-                time.sleep(INTER_CHUNK_DELAY)
-            
-            if content_chunks:
-                time.sleep(SPEAKER_TURN_DELAY)
-        
-        wav_files = [m['file'] for m in audio_metadata]
-        logger.info(f"TTS 변환 완료: 총 {len(wav_files)}개 파일")
         
-        return audio_metadata, wav_files
+        return await asyncio.gather(*(run(task) for task in tasks))
     
-    def _generate_single_audio(
+    async def _generate_single_audio(
         self,
         text: str,
         voice_name: str,
@@ -106,103 +332,97 @@ class TTSService:
         base_filename: str,
         index: int,
         chunk_index: int,
-        is_student: bool = False
+        is_student: bool = False,
+        quota_gate: _QuotaGate | None = None
     ) -> Dict[str, Any] | None:
         """단일 오디오 청크 생성 및 후처리(피치 조절)"""
         
+        cache_path = _tts_cache_path(voice_name, text) if TTS_CACHE_ENABLED else None
+        if cache_path:
+            # 같은 청크를 선행 합성 중이면 중복 호출 대신 완료를 기다림
+            with _prefetch_lock:
+                pending = _prefetch_inflight.get(cache_path)
+            if pending is not None:
+                await asyncio.wrap_future(pending)
+        cached_pcm = await asyncio.to_thread(_read_tts_cache, cache_path) if cache_path else None
+        
         for attempt in range(MAX_RETRIES):
             try:
-                config = {
-                    "response_modalities": ["AUDIO"],
-                    "speech_config": {
-                        "voice_config": {
-                            "prebuilt_voice_config": {"voice_name": voice_name},
-                        }
-                    }
-                }
-                
-                response = self.model.generate_content(
-                    contents=[{"role": "user", "parts": [{"text": text}]}],
-                    generation_config=config
-                )
-                
-                if not response.candidates:
-                     raise Exception("Candidate 없음")
-
-                candidate = response.candidates[0]
-                audio_data_part = next(
-                    (p for p in candidate.content.parts
-                     if p.inline_data and p.inline_data.mime_type.startswith("audio/")),
-                    None
-                )
-                
-                if not audio_data_part:
-                    raise Exception("오디오 데이터 누락")
+                if cached_pcm:
+                    pcm_bytes = cached_pcm
+                else:
+                    if quota_gate is not None:
+                        await quota_gate.wait()
+                    # 동기 SDK 호출을 스레드로 넘겨 이벤트 루프를 막지 않음
+                    pcm_bytes = await asyncio.to_thread(self._request_pcm, text, voice_name)
+                    if cache_path:
+                        await asyncio.to_thread(_write_tts_cache, cache_path, pcm_bytes)
                 
-                pcm_bytes = base64_to_bytes(audio_data_part.inline_data.data)
+                if is_student:
+                    # 학생 목소리 피치 조절: 메모리에서 바로 리샘플링 (청크마다 FFmpeg 프로세스를 띄우지 않음)
+                    pcm_bytes = pitch_shift_pcm(pcm_bytes, STUDENT_PITCH_FACTOR)
                 
-                sample_rate = 24000
-                duration_seconds = len(pcm_bytes) / (sample_rate * 2)
+                sample_rate = TTS_SAMPLE_RATE
+                # 길이는 정수 밀리초로 관리 (트랜스크립트 타임스탬프 누적 시 오차 없음)
+                duration_ms = len(pcm_bytes) * 1000 // _PCM_BYTES_PER_SEC
                 
                 # ✅ 환경 변수 기반 경로 사용
                 output_dir = get_wav_output_dir()
                 os.makedirs(output_dir, exist_ok=True)
                 
-                safe_speaker = re.sub(r"[^a-zA-Z0-9가-힣]", "", speaker)
+                safe_speaker = _UNSAFE_SPEAKER_RE.sub("", speaker)
                 output_file = os.path.join(output_dir, f"{base_filename}_{index + 1}_{safe_speaker}_{chunk_index}.wav")
                 
-                wav_bytes = pcm_to_wav(pcm_bytes, sample_rate=sample_rate)
-                
-                with open(output_file, "wb") as f:
-                    f.write(wav_bytes)
-
-                if is_student:
-                    temp_file = output_file.replace(".wav", "_temp.wav")
-                    os.rename(output_file, temp_file)
-                    
-                    try:
-                        new_rate = int(sample_rate * STUDENT_PITCH_FACTOR)
-                        
-                        command = [
-                            "ffmpeg", "-i", temp_file,
-                            "-af", f"asetrate={new_rate},aresample={sample_rate}",
-                            "-y", output_file
-                        ]
-                        
-                        subprocess.run(
-                            command, 
-                            check=True, 
-                            capture_output=True 
-                        )
-                        
-                        os.remove(temp_file)
-                        duration_seconds = duration_seconds / STUDENT_PITCH_FACTOR
-                        
-                    except Exception as e:
-                        logger.error(f"피치 조절 실패 (원본 사용): {e}")
-                        if os.path.exists(temp_file):
-                            os.rename(temp_file, output_file)
+                # 디스크 쓰기는 스레드로 넘겨 다른 청크의 요청 처리를 막지 않음
+                await asyncio.to_thread(write_wav, output_file, pcm_bytes, sample_rate)
 
                 return {
                     'speaker': speaker,
                     'text': text,
-                    'duration': duration_seconds,
+                    'duration': duration_ms / 1000,
+                    'duration_ms': duration_ms,
                     'file': output_file
                 }
                 
             except Exception as e:
                 if "429" in str(e) or "quota" in str(e).lower():
-                    wait_time = 10.0 * (attempt + 1)
-                    logger.warning(f"🚨 쿼터 주의(429) - {wait_time}초 대기...")
-                    time.sleep(wait_time)
+                    wait_time = _backoff_delay(QUOTA_BASE_DELAY, attempt)
+                    logger.warning(f"🚨 쿼터 주의(429) - {wait_time:.1f}초 대기...")
+                    if quota_gate is not None:
+                        quota_gate.block_for(wait_time)
+                        await quota_gate.wait()
+                    else:
+                        await asyncio.sleep(wait_time)
                     continue
                 
                 if attempt < MAX_RETRIES - 1:
-                    delay = BASE_DELAY * (2 ** attempt)
+                    delay = _backoff_delay(BASE_DELAY, attempt)
                     logger.warning(f"TTS 재시도 {attempt + 1}/{MAX_RETRIES} ({delay:.1f}초 후)")
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
                 else:
                     logger.error(f"TTS 최종 실패: {str(e)}")
                     return None
         
-        return None
\ No newline at end of file
+        return None
+    
+    def _request_pcm(self, text: str, voice_name: str) -> bytes:
+        """Vertex AI TTS 호출 후 원본 PCM(24kHz, 16bit mono) 반환"""
+        response = self.model.generate_content(
+            contents=[{"role": "user", "parts": [{"text": text}]}],
+            generation_config=_tts_config(voice_name)
+        )
+        
+        if not response.candidates:
+             raise Exception("Candidate 없음")
+
+        candidate = response.candidates[0]
+        audio_data_part = next(
+            (p for p in candidate.content.parts
+             if p.inline_data and p.inline_data.mime_type.startswith("audio/")),
+            None
+        )
+        
+        if not audio_data_part:
+            raise Exception("오디오 데이터 누락")
+        
+        return base64_to_bytes(audio_data_part.inline_data.data)
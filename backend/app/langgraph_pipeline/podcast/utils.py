@@ -3,10 +3,21 @@
 import re
 import base64
 import struct
+import numpy as np
 from typing import List, Tuple
 
 # [삭제됨] generate_korean_names 함수 및 random 임포트 제거
 
+# 청크/문장마다 호출되므로 정규식은 모듈 로드 시 한 번만 컴파일
+_WS_RE = re.compile(r"\s+")
+_HOST_TAG_RE = re.compile(r"\[진행자\s*이름\]", re.IGNORECASE)
+_GUEST_TAG_RE = re.compile(r"\[게스트\s*이름\]", re.IGNORECASE)
+_KEEP_RE = re.compile(r"[^가-힣a-zA-Z0-9.,?! ]")
+_SENT_END_RE = re.compile(r"([.?!])\s*")
+
+# 44바이트 고정 WAV(RIFF) 헤더 레이아웃
+_WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
 def sanitize_tts_text(
     text: str,
     host_name: str = "",
@@ -15,75 +26,95 @@ def sanitize_tts_text(
     """TTS용 텍스트 정리"""
 
     # 공백 정리
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _WS_RE.sub(" ", text).strip()
 
     # 진행자 이름 치환
-    text = re.sub(
-        r"\[진행자\s*이름\]",
-        host_name or "진행자",
-        text,
-        flags=re.IGNORECASE
-    )
+    text = _HOST_TAG_RE.sub(host_name or "진행자", text)
 
     # 게스트 이름 치환 (None 안전 처리)
-    if guest_name:
-        text = re.sub(
-            r"\[게스트\s*이름\]",
-            guest_name,
-            text,
-            flags=re.IGNORECASE
-        )
-    else:
-        # 게스트 없는 경우 placeholder 제거
-        text = re.sub(
-            r"\[게스트\s*이름\]",
-            "",
-            text,
-            flags=re.IGNORECASE
-        )
-
-    # 제어 문자 제거
-    text = re.sub(r"[\x00-\x1f\x7f-\x9f\ufeff]", "", text)
+    # 게스트 없는 경우 placeholder 제거
+    text = _GUEST_TAG_RE.sub(guest_name or "", text)
 
     # 허용 문자만 남기기 (한글, 영문, 숫자, 기본 문장부호)
-    text = re.sub(r"[^가-힣a-zA-Z0-9.,?! ]", "", text)
+    # 제어 문자/BOM도 허용 목록 밖이므로 이 한 번의 패스로 함께 제거됨
+    text = _KEEP_RE.sub("", text)
 
     return text.strip()
 
 
 def chunk_text(text: str, max_chars: int = 200) -> List[str]:
     """긴 텍스트를 문장 경계를 유지하며 분할"""
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _WS_RE.sub(" ", text).strip()
     if len(text) <= max_chars:
         return [text]
     
     chunks = []
-    current_chunk = ""
-    sentences = re.split(r'([.?!])\s*', text)
-    
-    if len(sentences) % 2 != 0:
-        sentences.append("")
+    # 문자열 += 대신 조각 리스트 + 길이 카운터로 누적 (청크 확정 시 한 번만 join)
+    current_parts: List[str] = []
+    current_len = 0
     
-    for i in range(0, len(sentences), 2):
-        sentence = sentences[i].strip()
-        delimiter = sentences[i+1] if i + 1 < len(sentences) else ""
-        full_sentence = sentence + delimiter
-        
+    def add_unit(full_sentence: str) -> None:
+        nonlocal current_parts, current_len
         if not full_sentence.strip():
-            continue
+            return
         
-        if len(current_chunk) + len(full_sentence) > max_chars and current_chunk:
-            chunks.append(current_chunk.strip())
-            current_chunk = full_sentence
+        if current_len + len(full_sentence) > max_chars and current_parts:
+            chunks.append("".join(current_parts).strip())
+            current_parts = [full_sentence]
+            current_len = len(full_sentence)
         else:
-            current_chunk += full_sentence
+            current_parts.append(full_sentence)
+            current_len += len(full_sentence)
     
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+    # 문장부호 위치를 순회하며 "문장 + 부호" 단위를 바로 잘라냄 (split 중간 리스트 없음)
+    pos = 0
+    for m in _SENT_END_RE.finditer(text):
+        add_unit(text[pos:m.start()].strip() + m.group(1))
+        pos = m.end()
+    add_unit(text[pos:].strip())
+    
+    if current_parts:
+        chunks.append("".join(current_parts).strip())
     
     return chunks
 
 
+def iter_turn_spans(script: str):
+    """
+    스크립트를 (화자 태그, 태그 시작 위치, 내용) 턴으로 순회 (TTS 분할과 스트리밍 선행 합성이 공유)
+    - 태그가 하나도 없으면 전체를 ("선생님", None, 전체) 한 턴으로 처리
+    - 첫 태그 앞의 텍스트와 내용이 빈 턴은 건너뜀
+    """
+    speaker_tag = None
+    tag_start = None
+    last = 0
+    search_from = 0
+    # '['와 그 다음 ']'를 str.find로 찾아 건너뜀 ([] 빈 태그는 본문으로, 닫히지 않은 '['부터는 본문으로 취급)
+    while True:
+        lb = script.find("[", search_from)
+        if lb < 0:
+            break
+        rb = script.find("]", lb + 1)
+        if rb < 0:
+            break
+        if rb == lb + 1:
+            search_from = lb + 1
+            continue
+        if speaker_tag is not None:
+            content = script[last:lb].strip()
+            if content:
+                yield speaker_tag, tag_start, content
+        speaker_tag = script[lb + 1:rb].strip()
+        tag_start = lb
+        last = search_from = rb + 1
+    
+    if speaker_tag is None:
+        speaker_tag = "선생님"
+    content = script[last:].strip()
+    if content:
+        yield speaker_tag, tag_start, content
+
+
 def base64_to_bytes(base64_string: str) -> bytes:
     """Base64 문자열을 바이트로 디코딩"""
     try:
@@ -97,6 +128,24 @@ def base64_to_bytes(base64_string: str) -> bytes:
         return b""
 
 
+def wav_header(
+    data_size: int, 
+    sample_rate: int = 24000, 
+    num_channels: int = 1, 
+    bits_per_sample: int = 16
+) -> bytes:
+    """PCM 데이터 크기에 맞는 44바이트 WAV 헤더"""
+    byte_rate = sample_rate * num_channels * bits_per_sample // 8
+    block_align = num_channels * bits_per_sample // 8
+    chunk_size = 36 + data_size
+    
+    return _WAV_HEADER.pack(
+        b'RIFF', chunk_size, b'WAVE',
+        b'fmt ', 16, 1, num_channels, sample_rate, byte_rate, block_align, bits_per_sample,
+        b'data', data_size
+    )
+
+
 def pcm_to_wav(
     pcm_data: bytes, 
     sample_rate: int = 24000, 
@@ -104,23 +153,47 @@ def pcm_to_wav(
     bits_per_sample: int = 16
 ) -> bytes:
     """PCM을 WAV 형식으로 변환"""
-    byte_rate = sample_rate * num_channels * bits_per_sample // 8
-    block_align = num_channels * bits_per_sample // 8
-    subchunk2_size = len(pcm_data)
-    chunk_size = 36 + subchunk2_size
+    return wav_header(len(pcm_data), sample_rate, num_channels, bits_per_sample) + pcm_data
+
+
+def write_wav(
+    path: str,
+    pcm_data: bytes,
+    sample_rate: int = 24000,
+    num_channels: int = 1,
+    bits_per_sample: int = 16
+) -> None:
+    """헤더와 PCM을 이어붙인 사본 없이 WAV 파일로 바로 기록"""
+    with open(path, "wb") as f:
+        f.write(wav_header(len(pcm_data), sample_rate, num_channels, bits_per_sample))
+        f.write(pcm_data)
+
+# 피치 올림(factor > 1) 시 앨리어싱 방지용 저역통과 FIR 탭 수 (홀수)
+_PITCH_LPF_TAPS = 63
+
+
+def _lowpass_kernel(cutoff: float, taps: int = _PITCH_LPF_TAPS) -> np.ndarray:
+    """해밍 창 windowed-sinc 저역통과 필터 (cutoff: 샘플레이트 대비 비율, 0 < cutoff <= 0.5)"""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return kernel / kernel.sum()
+
+
+def pitch_shift_pcm(pcm_data: bytes, factor: float) -> bytes:
+    """
+    16bit PCM 피치/속도 변경 (FFmpeg asetrate + aresample과 같은 효과)
+    - 샘플을 factor배 빠르게 재생한 뒤 원래 샘플레이트로 리샘플링
+    - factor > 1이면 새 나이퀴스트를 넘는 대역을 먼저 걸러 앨리어싱 방지 (windowed-sinc)
+    - 출력 길이는 입력의 1/factor
+    """
+    samples = np.frombuffer(pcm_data, dtype='<i2')
+    if len(samples) < 2:
+        return pcm_data
     
-    wav_header = b'RIFF'
-    wav_header += struct.pack('<I', chunk_size)
-    wav_header += b'WAVE'
-    wav_header += b'fmt '
-    wav_header += struct.pack('<I', 16)
-    wav_header += struct.pack('<H', 1)
-    wav_header += struct.pack('<H', num_channels)
-    wav_header += struct.pack('<I', sample_rate)
-    wav_header += struct.pack('<I', byte_rate)
-    wav_header += struct.pack('<H', block_align)
-    wav_header += struct.pack('<H', bits_per_sample)
-    wav_header += b'data'
-    wav_header += struct.pack('<I', subchunk2_size)
+    source = samples.astype(np.float64)
+    if factor > 1:
+        source = np.convolve(source, _lowpass_kernel(0.5 / factor), mode='same')
     
-    return wav_header + pcm_data
\ No newline at end of file
+    positions = np.arange(int(len(samples) / factor)) * factor
+    shifted = np.interp(positions, np.arange(len(samples)), source)
+    return np.clip(np.round(shifted), -32768, 32767).astype('<i2').tobytes()
@@ -0,0 +1,77 @@
+# app/langgraph_pipeline/podcast/vertex_auth.py
+
+import os
+import logging
+import threading
+from google.oauth2 import service_account
+import vertexai
+
+logger = logging.getLogger(__name__)
+
+# vertexai.init은 프로세스 전역 설정이므로 (project, region, sa_file)이 바뀔 때만 다시 수행
+# (스크립트 생성/이미지 필터 등 파이프라인의 모든 Gemini 호출이 같은 설정을 공유)
+_vertex_init_key: tuple[str, str, str] | None = None
+_vertex_init_lock = threading.Lock()
+
+
+# 서비스 계정 파일 -> Credentials (로드에 성공한 경우만 보관, 파일이 나중에 생기면 다시 시도)
+_credentials_cache: dict[str, service_account.Credentials] = {}
+
+
+def _load_credentials(sa_file: str):
+    """서비스 계정 인증 정보 로드 (파일별 1회만 파싱, Credentials 객체는 재사용 가능)"""
+    credentials = _credentials_cache.get(sa_file)
+    if credentials is not None:
+        return credentials
+    # 존재 여부를 따로 확인하지 않고 바로 열어 봄 (stat 호출/경합 없음)
+    try:
+        if sa_file:
+            credentials = service_account.Credentials.from_service_account_file(sa_file)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        raise RuntimeError(f"서비스 계정 파일 로드 오류: {e}")
+    if credentials is None:
+        logger.warning(f"서비스 계정 파일을 찾을 수 없습니다: {sa_file}")
+        return None
+    _credentials_cache[sa_file] = credentials
+    return credentials
+
+
+def ensure_vertex_init(project_id: str, region: str, sa_file: str) -> None:
+    """Vertex AI 초기화 (동일 설정으로 이미 초기화됐으면 생략)"""
+    global _vertex_init_key
+    key = (project_id, region, sa_file)
+    if _vertex_init_key == key:
+        return
+
+    with _vertex_init_lock:
+        if _vertex_init_key == key:
+            return
+
+        credentials = _load_credentials(sa_file)
+
+        # [중요] 401 인증 오류 방지를 위한 환경 변수 강제 설정 (파일을 실제로 읽은 경우만)
+        if credentials is not None:
+            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = sa_file
+            logger.info(f"인증 파일 환경변수 설정 완료: {sa_file}")
+
+        try:
+            vertexai.init(
+                project=project_id,
+                location=region,
+                credentials=credentials
+            )
+            logger.info(f"Vertex AI 초기화 완료: {project_id} / {region}")
+        except Exception as e:
+            logger.error(f"Vertex AI 초기화 실패: {e}")
+            raise
+
+        # 인증 파일 없이 초기화한 경우는 기록하지 않음 (파일이 준비되면 다음 호출에서 다시 초기화)
+        if credentials is not None:
+            _vertex_init_key = key
+
+
+def vertex_init_key() -> tuple[str, str, str] | None:
+    """현재 적용된 Vertex AI 초기화 설정 (project, region, sa_file)"""
+    return _vertex_init_key
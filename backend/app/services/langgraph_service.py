@@ -1,9 +1,10 @@
 # app/services/langgraph_service.py
 import os
+import uuid
 import logging
 from typing import List, Dict, Any, Callable
 
-from app.langgraph_pipeline.podcast.graph import create_podcast_graph
+from app.langgraph_pipeline.podcast.graph import get_podcast_app
 from app.langgraph_pipeline.podcast.state import PodcastState
 from app.utils.output_helpers import output_exists
 
@@ -35,7 +36,7 @@ async def run_langgraph(
     Podcast 전용 LangGraph 실행
     output_id가 삭제되면 CancelledException을 발생시켜 조기 종료
     """
-    graph = create_podcast_graph()
+    graph = get_podcast_app()
 
     initial_state: PodcastState = {
         "main_sources": main_sources,
@@ -70,26 +71,28 @@ async def run_langgraph(
         logger.info(f"⚠️ Output {output_id}가 이미 삭제됨 - 실행 취소")
         raise CancelledException(f"Output {output_id} was deleted before execution")
 
-    thread_id = f"output_{output_id}" if output_id else f"run_{id(initial_state)}"
+    # 실행마다 고유 ID 사용 (로그/추적용, 재시도 실행과 구분)
+    run_suffix = uuid.uuid4().hex[:8]
+    thread_id = f"output_{output_id}_{run_suffix}" if output_id else f"run_{run_suffix}"
     config = {"configurable": {"thread_id": thread_id}}
     
     last_step = "start"
     final_state = None
     
-    async for event in graph.astream(initial_state, config=config):
-        for node_name, node_state in event.items():
-            # 🔥 각 노드 완료 시점마다 output 존재 확인
-            if output_id and not output_exists(output_id):
-                logger.info(f"⚠️ Output {output_id}가 삭제됨 - 실행 중단")
-                raise CancelledException(f"Output {output_id} was deleted during execution")
-            
-            final_state = node_state
-            current_step = node_state.get("current_step", last_step)
-            
-            if current_step != last_step and step_callback:
-                step_callback(current_step)
-                last_step = current_step
-                logger.info(f"📍 Step updated: {current_step}")
+    # 노드는 변경분만 반환하므로 병합된 전체 state를 받도록 values 모드로 스트리밍
+    async for node_state in graph.astream(initial_state, config=config, stream_mode="values"):
+        # 🔥 각 노드 완료 시점마다 output 존재 확인
+        if output_id and not output_exists(output_id):
+            logger.info(f"⚠️ Output {output_id}가 삭제됨 - 실행 중단")
+            raise CancelledException(f"Output {output_id} was deleted during execution")
+        
+        final_state = node_state
+        current_step = node_state.get("current_step", last_step)
+        
+        if current_step != last_step and step_callback:
+            step_callback(current_step)
+            last_step = current_step
+            logger.info(f"📍 Step updated: {current_step}")
 
     # 최종 상태 검증
     if not final_state:
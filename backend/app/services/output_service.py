@@ -1,13 +1,20 @@
 # backend/app/services/output_service.py
 import os
+import asyncio
 import tempfile
+import httpx
 from datetime import datetime, timedelta
-from app.services.supabase_service import supabase, upload_bytes, BUCKET
+from app.services.supabase_service import supabase, upload_bytes, create_signed_url, BUCKET
 from app.services.langgraph_service import run_langgraph, CancelledException
 from app.utils.output_helpers import output_exists
 
 # 모듈 레벨 변수 제거 - 함수 실행 시점에 읽도록 변경
 
+# Storage 입력 파일 다운로드 청크 크기 (파일 전체를 메모리에 올리지 않고 바로 디스크에 기록)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = 120.0
+DOWNLOAD_CONCURRENCY = int(os.getenv("DOWNLOAD_CONCURRENCY", "8"))
+
 def update_output_step(output_id: int, current_step: str):
     """output의 현재 진행 단계 업데이트"""
     try:
@@ -59,6 +66,46 @@ def delete_output_internal(output_id: int):
         print("[delete_output_internal Error]", e)
 
 
+def upload_local_file(local_path: str, folder: str, content_type: str):
+    """
+    로컬 파일을 같은 이름으로 Storage에 업로드하고 저장 경로 반환
+    - 파일 핸들을 그대로 넘겨 multipart 요청이 디스크에서 읽어 보냄 (전체를 bytes로 올리지 않음)
+    """
+    with open(local_path, "rb") as f:
+        return upload_bytes(
+            f,
+            folder=folder,
+            filename=os.path.basename(local_path),
+            content_type=content_type
+        )
+
+
+async def download_to_temp(client: httpx.AsyncClient, storage_path: str, input_id) -> str:
+    """Storage 파일을 signed URL로 스트리밍 다운로드하여 임시 파일 경로 반환"""
+    signed_url = await asyncio.to_thread(create_signed_url, storage_path, 600)
+    if not signed_url:
+        raise Exception("signed URL 생성 실패")
+
+    file_ext = os.path.splitext(storage_path)[1]
+    temp_fd, temp_path = tempfile.mkstemp(suffix=file_ext, prefix=f"input_{input_id}_")
+
+    size = 0
+    try:
+        with os.fdopen(temp_fd, 'wb') as f:
+            async with client.stream("GET", signed_url, timeout=DOWNLOAD_TIMEOUT) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.aiter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    size += len(chunk)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    print(f"다운로드 완료: {temp_path} ({size:,} bytes)")
+    return temp_path
+
+
 async def process_langgraph_output(
     project_id,
     output_id,
@@ -117,38 +164,39 @@ async def process_langgraph_output(
         main_sources = []
         aux_sources = []
         
-        for r in rows.data:
-            source_path = None
-
-            if r["is_link"]:
-                source_path = r["link_url"]
-                print(f"link URL: {r['link_url'][:80]}...")
-            else:
-                storage_path = r["storage_path"]
-                print(f"Storage path: {storage_path}")
-                
+        # 입력 파일은 동시에 다운로드 (하나의 커넥션 풀 공유, 동시 요청 수 제한)
+        source_paths = [None] * len(rows.data)
+        semaphore = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+
+        async def download(i, r, http_client):
+            storage_path = r["storage_path"]
+            print(f"Storage path: {storage_path}")
+            async with semaphore:
                 try:
-                    file_data = supabase.storage.from_(BUCKET).download(storage_path)
-                    print(f"다운로드 완료: {len(file_data):,} bytes")
-                    
-                    file_ext = os.path.splitext(storage_path)[1]
-                    temp_fd, temp_path = tempfile.mkstemp(suffix=file_ext, prefix=f"input_{r['id']}_")
-                    
-                    with os.fdopen(temp_fd, 'wb') as f:
-                        f.write(file_data)
-                    
-                    temp_files.append(temp_path)
-                    source_path = temp_path
-                    
-                    print(f"임시 파일: {temp_path}")
-                    print(f"크기: {len(file_data):,} bytes")
-
+                    source_paths[i] = await download_to_temp(http_client, storage_path, r["id"])
+                    temp_files.append(source_paths[i])
                 except Exception as download_error:
                     print(f"Storage 다운로드 실패: {download_error}")
                     import traceback
                     traceback.print_exc()
                     raise Exception(f"Storage 접근 실패 ({storage_path}): {str(download_error)}")
 
+        async with httpx.AsyncClient() as http_client:
+            download_tasks = []
+            for i, r in enumerate(rows.data):
+                if r["is_link"]:
+                    source_paths[i] = r["link_url"]
+                    print(f"link URL: {r['link_url'][:80]}...")
+                else:
+                    download_tasks.append(download(i, r, http_client))
+
+            # 실패가 있어도 나머지 다운로드를 끝까지 기다린 뒤 (임시 파일 정리 대상 확정) 첫 오류를 전달
+            results = await asyncio.gather(*download_tasks, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+
+        for r, source_path in zip(rows.data, source_paths):
             if r["id"] == main_input_id:
                 main_sources.append(source_path)
                 print(f"✅ 주 소스로 추가: {source_path}")
@@ -198,24 +246,12 @@ async def process_langgraph_output(
             print(f"[LangGraph] Output 결과 저장 직전에 output_id={output_id}가 삭제됨. 파일 업로드/DB 업데이트 스킵.")
             return
 
-        base_audio_name = os.path.basename(audio_local)
-        base_script_name = os.path.basename(script_local)
-
-        with open(audio_local, "rb") as f:
-            audio_url = upload_bytes(
-                f.read(),
-                folder=f"user/{user_id}/project/{project_id}/outputs",
-                filename=base_audio_name,
-                content_type="audio/mpeg"
-            )
-
-        with open(script_local, "rb") as f:
-            script_url = upload_bytes(
-                f.read(),
-                folder=f"user/{user_id}/project/{project_id}/outputs",
-                filename=base_script_name,
-                content_type="text/plain"
-            )
+        # 오디오/스크립트 업로드는 서로 독립적이므로 동시에 수행
+        output_folder = f"user/{user_id}/project/{project_id}/outputs"
+        audio_url, script_url = await asyncio.gather(
+            asyncio.to_thread(upload_local_file, audio_local, output_folder, "audio/mpeg"),
+            asyncio.to_thread(upload_local_file, script_local, output_folder, "text/plain"),
+        )
 
         print(f"Storage에 Output 파일 업로드 완료")
 
@@ -299,9 +335,10 @@ async def process_langgraph_output(
     finally:
         for temp_file in temp_files:
             try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-                    print(f"임시 파일 삭제됨: {temp_file}")
+                os.remove(temp_file)
+                print(f"임시 파일 삭제됨: {temp_file}")
+            except FileNotFoundError:
+                pass
             except Exception as cleanup_error:
                 print(f"임시 파일 삭제 실패: {temp_file} - {cleanup_error}")
         print(f"임시 파일 정리 완료")
\ No newline at end of file
@@ -23,7 +23,7 @@ BUCKET = "project_resources"
 def safe_filename(filename: str) -> str:
     return re.sub(r"[^A-Za-z0-9_.-]", "_", filename)
 
-# Storage에 파일 업로드(bytes) 후 public URL 반환
+# Storage에 파일 업로드(bytes 또는 'rb'로 연 파일 객체) 후 public URL 반환
 def upload_bytes(file_bytes, folder, filename, content_type=None):
     path = f"{folder}/{filename}"
 
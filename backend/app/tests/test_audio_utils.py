@@ -0,0 +1,64 @@
+import io
+import wave
+
+import numpy as np
+
+from app.langgraph_pipeline.podcast.utils import pcm_to_wav, pitch_shift_pcm, wav_header
+
+SAMPLE_RATE = 24000
+
+
+def _tone(freq: float, seconds: float = 0.5, amplitude: float = 10000) -> bytes:
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return np.round(amplitude * np.sin(2 * np.pi * freq * t)).astype('<i2').tobytes()
+
+
+def _band_rms(pcm: bytes, low: float, high: float) -> float:
+    samples = np.frombuffer(pcm, dtype='<i2').astype(np.float64)
+    spectrum = np.abs(np.fft.rfft(samples)) / len(samples)
+    freqs = np.fft.rfftfreq(len(samples), 1 / SAMPLE_RATE)
+    band = (freqs >= low) & (freqs <= high)
+    return float(np.sqrt(np.sum(spectrum[band] ** 2)))
+
+
+def test_pitch_shift_output_length():
+    pcm = _tone(440)
+    shifted = pitch_shift_pcm(pcm, 1.25)
+    assert len(shifted) // 2 == int((len(pcm) // 2) / 1.25)
+
+
+def test_pitch_shift_moves_tone_up():
+    shifted = pitch_shift_pcm(_tone(1000), 1.2)
+    # 1kHz → 1.2kHz, 통과 대역 성분은 그대로 유지
+    assert _band_rms(shifted, 1150, 1250) > 10 * _band_rms(shifted, 950, 1050)
+    assert _band_rms(shifted, 1150, 1250) > 0.8 * _band_rms(_tone(1200), 1150, 1250)
+
+
+def test_pitch_shift_suppresses_aliasing():
+    # 11kHz × 1.5 = 16.5kHz는 나이퀴스트(12kHz)를 넘어 7.5kHz로 접힘 → 걸러져야 함
+    shifted = pitch_shift_pcm(_tone(11000), 1.5)
+    assert _band_rms(shifted, 7000, 8000) < 0.05 * _band_rms(_tone(11000), 10500, 11500)
+
+
+def test_pitch_shift_short_input_unchanged():
+    assert pitch_shift_pcm(b"\x01\x00", 1.2) == b"\x01\x00"
+
+
+def test_wav_header_layout():
+    header = wav_header(1000, sample_rate=24000, num_channels=1, bits_per_sample=16)
+    assert header == (
+        b"RIFF" + (1036).to_bytes(4, "little") + b"WAVE"
+        + b"fmt " + (16).to_bytes(4, "little") + (1).to_bytes(2, "little") + (1).to_bytes(2, "little")
+        + (24000).to_bytes(4, "little") + (48000).to_bytes(4, "little")
+        + (2).to_bytes(2, "little") + (16).to_bytes(2, "little")
+        + b"data" + (1000).to_bytes(4, "little")
+    )
+
+
+def test_pcm_to_wav_readable_by_wave_module():
+    pcm = _tone(440, seconds=0.1)
+    with wave.open(io.BytesIO(pcm_to_wav(pcm, sample_rate=SAMPLE_RATE, num_channels=2)), "rb") as wav:
+        assert wav.getnchannels() == 2
+        assert wav.getsampwidth() == 2
+        assert wav.getframerate() == SAMPLE_RATE
+        assert wav.readframes(wav.getnframes()) == pcm
@@ -0,0 +1,43 @@
+import json
+
+from app.langgraph_pipeline.podcast import metadata_generator_node
+from app.langgraph_pipeline.podcast.metadata_generator_node import ImageDescriptionGenerator
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class _BatchModel:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, parts, generation_config=None):
+        self.calls += 1
+        count = sum(1 for part in parts if isinstance(part, str) and part.startswith("[이미지"))
+        return _Response(json.dumps([{"id": i, "description": f"설명 {i}"} for i in range(count)]))
+
+
+def test_batch_results_cached_and_locks_pruned(monkeypatch):
+    model = _BatchModel()
+    monkeypatch.setattr(metadata_generator_node, "get_model", lambda: model)
+    generator = ImageDescriptionGenerator()
+    items = [(b"\x89PNG\r\n\x1a\n" + bytes([i]), f"문맥 {i}") for i in range(3)]
+
+    assert generator.generate_descriptions_batch(items, ["광합성"]) == ["설명 0", "설명 1", "설명 2"]
+    assert model.calls == 1
+    assert len(generator._desc_cache) == 3
+    assert generator._key_locks == {}
+
+    # 두 번째 호출은 캐시에서 바로 반환
+    assert generator.generate_descriptions_batch(items, ["광합성"]) == ["설명 0", "설명 1", "설명 2"]
+    assert model.calls == 1
+
+
+def test_key_guard_reentrant_and_pruned():
+    generator = ImageDescriptionGenerator()
+    with generator._key_guard(b"k"):
+        with generator._key_guard(b"k"):
+            assert generator._key_locks[b"k"][1] == 2
+    assert generator._key_locks == {}
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from app.langgraph_pipeline.podcast import improved_hybrid_filter
+from app.langgraph_pipeline.podcast.improved_hybrid_filter import (
+    ImageMetadata,
+    ImprovedHybridFilterPipeline,
+    _rule_codes_numpy,
+    _strip_code_fence,
+)
+
+
+def _meta(area, left=5.0, top=5.0, text="", title=""):
+    return ImageMetadata(
+        image_id="img", slide_number=1, area_percentage=area,
+        left=left, top=top, adjacent_text=text, slide_title=title,
+    )
+
+
+PENDING = ("PENDING", "Requires AI Vision Check")
+
+CASES = [
+    # 코너 장식: 면적 5% 미만 + 범용 패턴 없음
+    (_meta(4.9, left=0.5, top=0.5), ("EXCLUDE", "Static Decoration (Corner)")),
+    (_meta(5.0, left=0.5, top=0.5), PENDING),
+    (_meta(3.0, left=8.1, top=0.5), ("EXCLUDE", "Static Decoration (Corner)")),
+    (_meta(3.0, left=8.0, top=0.5), PENDING),
+    (_meta(3.0, left=0.5, top=0.5, text="학습 목표"), PENDING),
+    # 장식 키워드: 면적 8% 미만
+    (_meta(7.9, text="회사 로고"), ("EXCLUDE", "Decorative element")),
+    (_meta(8.0, text="회사 로고"), PENDING),
+    # 핵심 콘텐츠: 면적 15% 초과 + 범용/문서 패턴
+    (_meta(15.0, title="개념 정리"), PENDING),
+    (_meta(15.1, title="개념 정리"), ("INCLUDE", "Core content (15.1% + pattern)")),
+    # 문서 키워드: 면적 10% 초과
+    (_meta(10.0, text="광합성 과정"), PENDING),
+    (_meta(10.5, text="광합성 과정"), ("INCLUDE", "Document keyword: 광합성")),
+    (_meta(20.0, text="광합성 과정"), ("INCLUDE", "Core content (20.0% + pattern)")),
+    (_meta(50.0), PENDING),
+]
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = ImprovedHybridFilterPipeline(auto_extract_keywords=False)
+    pipeline.document_keywords = ["광합성", "엽록체"]
+    return pipeline
+
+
+def test_rule_check_all_decisions(pipeline):
+    metas = [meta for meta, _ in CASES]
+    assert pipeline.rule_check_all(metas) == [expected for _, expected in CASES]
+
+
+@pytest.mark.parametrize("meta,expected", CASES)
+def test_step1_rule_check_matches_batch(pipeline, meta, expected):
+    assert pipeline.step1_rule_check(meta) == expected
+
+
+def test_rule_check_all_empty(pipeline):
+    assert pipeline.rule_check_all([]) == []
+
+
+# (area, left, top, universal, deco, doc_kw) → 판정 코드
+CODE_CASES = [
+    (4.9, 0.5, 0.5, False, False, False, 1),
+    (5.0, 0.5, 0.5, False, False, False, 0),
+    (3.0, 8.0, 0.5, False, False, False, 0),
+    (3.0, 0.5, 0.5, True, False, False, 0),
+    (7.9, 5.0, 5.0, False, True, False, 2),
+    (15.1, 5.0, 5.0, True, False, False, 3),
+    (15.0, 5.0, 5.0, True, False, False, 0),
+    (10.5, 5.0, 5.0, False, False, True, 4),
+    (16.0, 5.0, 5.0, False, False, True, 3),
+]
+
+
+def _code_arrays(repeat=1):
+    columns = list(zip(*CODE_CASES))
+    arrays = [np.array(col * repeat, dtype=np.float64) for col in columns[:3]]
+    arrays += [np.array(col * repeat, dtype=bool) for col in columns[3:6]]
+    return arrays, np.array(columns[6] * repeat, dtype=np.int8)
+
+
+def test_rule_codes_numpy():
+    arrays, expected = _code_arrays()
+    assert _rule_codes_numpy(*arrays).tolist() == expected.tolist()
+
+
+@pytest.mark.skipif(not improved_hybrid_filter.NUMBA_AVAILABLE, reason="numba 미설치")
+def test_rule_kernel_matches_expected_codes():
+    # 대형 덱 경로(numba 커널)로 분기되도록 임계값 이상으로 반복
+    repeat = improved_hybrid_filter._NUMBA_MIN_IMAGES // len(CODE_CASES) + 1
+    arrays, expected = _code_arrays(repeat)
+    assert improved_hybrid_filter._rule_codes(*arrays).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("text,expected", [
+    ('```json\n{"keywords": ["광합성"]}\n```', '{"keywords": ["광합성"]}'),
+    ('키워드입니다:\n```\n{"keywords": []}\n```\n끝', '{"keywords": []}'),
+    # 닫는 펜스가 없으면 끝까지
+    ('```json\n{"keywords": ["엽록체"]}', '{"keywords": ["엽록체"]}'),
+    # 펜스가 없으면 그대로
+    (' {"keywords": []} ', ' {"keywords": []} '),
+])
+def test_strip_code_fence(text, expected):
+    assert _strip_code_fence(text) == expected
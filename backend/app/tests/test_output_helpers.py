@@ -0,0 +1,24 @@
+import pytest
+
+from app.utils.output_helpers import to_seconds
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("01:02:03", 3723.0),
+    ("10:00:00", 36000.0),
+    # 고정 위치 경로(HH:MM:SS)가 아닌 형식은 split 경로로 동일하게 계산
+    ("1:02:03", 3723.0),
+    ("12:34", 754.0),
+    ("00:00:05.5", 5.5),
+    ("7.25", 7.25),
+    (90, 90.0),
+    (1.5, 1.5),
+    (None, None),
+])
+def test_to_seconds(value, expected):
+    assert to_seconds(value) == expected
+
+
+def test_to_seconds_rejects_malformed():
+    with pytest.raises(ValueError):
+        to_seconds("ab:cd:ef")
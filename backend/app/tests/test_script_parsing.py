@@ -0,0 +1,60 @@
+import pytest
+
+from app.langgraph_pipeline.podcast.script_generator import (
+    _extract_json_from_llm,
+    _extract_title_fallback,
+    _find_json_span,
+    _loads_llm_json,
+)
+
+
+@pytest.mark.parametrize("text,expected", [
+    ('{"a": 1}', '{"a": 1}'),
+    ('설명: {"a": {"b": 2}} 끝', '{"a": {"b": 2}}'),
+    # 뒤에 붙은 다른 객체는 포함하지 않음
+    ('{"a": 1} 그리고 {"b": 2}', '{"a": 1}'),
+    # 문자열 안의 중괄호는 무시
+    ('{"s": "}{"} 뒤', '{"s": "}{"}'),
+    # 이스케이프된 따옴표는 문자열을 닫지 않음
+    (r'{"s": "a\"}"} 뒤}', r'{"s": "a\"}"}'),
+    # 이스케이프된 역슬래시 뒤의 따옴표는 문자열을 닫음
+    (r'{"s": "a\\"} 뒤}', r'{"s": "a\\"}'),
+])
+def test_find_json_span(text, expected):
+    start, end = _find_json_span(text)
+    assert text[start:end] == expected
+
+
+@pytest.mark.parametrize("text", ['JSON 없음', '{"a": 1', '{"s": "}'])
+def test_find_json_span_unbalanced(text):
+    assert _find_json_span(text) is None
+
+
+def test_extract_json_strips_fence_and_trailing_text():
+    text = '```json\n{"title": "광합성", "script": "[선생님] {중괄호} 설명"}\n```\n추가 설명 {무시}'
+    assert _extract_json_from_llm(text) == {"title": "광합성", "script": "[선생님] {중괄호} 설명"}
+
+
+def test_extract_json_without_object_raises():
+    with pytest.raises(ValueError):
+        _extract_json_from_llm("JSON 블록이 없는 응답")
+
+
+def test_loads_llm_json_allows_raw_control_chars_in_strings():
+    # LLM이 문자열 안에 실제 줄바꿈/탭을 그대로 넣어도 파싱 (원문 그대로 유지)
+    assert _loads_llm_json('{"script": "[선생님] 첫 줄\n둘째 줄\t탭"}') == {"script": "[선생님] 첫 줄\n둘째 줄\t탭"}
+    assert _loads_llm_json('{"script": "이스케이프된\\n줄바꿈"}') == {"script": "이스케이프된\n줄바꿈"}
+
+
+def test_extract_json_with_raw_newline_in_script():
+    text = '{"title": "제목", "script": "[선생님] 하나\n[학생] 둘"}'
+    assert _extract_json_from_llm(text) == {"title": "제목", "script": "[선생님] 하나\n[학생] 둘"}
+
+
+@pytest.mark.parametrize("text,expected", [
+    ('{"title":  " 광합성의 원리 ", "script": 깨진 JSON', "광합성의 원리"),
+    ('"title": ""', None),
+    ("제목 없음", None),
+])
+def test_extract_title_fallback(text, expected):
+    assert _extract_title_fallback(text) == expected
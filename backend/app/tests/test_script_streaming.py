@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from app.langgraph_pipeline.podcast.script_generator import _StreamingScriptTurns
+from app.langgraph_pipeline.podcast.tts_service import _iter_turns
+
+SCRIPTS = [
+    "[선생님] 안녕하세요. 오늘은 \"광합성\"을 배워요.\n[학생] 네! [진행자 이름]님 반가워요.\n[선생님] 시작할게요.",
+    "도입부는 버려집니다 [선생님] 첫 턴 [] 빈 태그는 본문 [학생]   [선생님] 마지막 턴",
+    "태그가 없는 스크립트는 전체가 선생님 턴",
+    "[선생님] 닫히지 않은 [태그 뒤 본문",
+]
+
+
+def _stream(script: str, size: int):
+    raw = json.dumps({"title": "제목", "script": script}, ensure_ascii=False)
+    turns = _StreamingScriptTurns()
+    streamed = []
+    for i in range(0, len(raw), size):
+        streamed.extend(turns.feed(raw[i:i + size]))
+    return streamed
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 10_000])
+def test_streamed_turns_match_final_split(script, size):
+    # 선행 합성 캐시 키가 본 합성과 맞으려면 마지막 턴까지 동일하게 분할되어야 함
+    assert _stream(script, size) == list(_iter_turns(script))
+
+
+def test_escape_split_across_chunks():
+    turns = _StreamingScriptTurns()
+    pieces = ['{"script": "[선생님] 첫 줄\\', 'n\\"인용\\', '" 끝 [학', '생] 질문\\u00', '3f"}']
+    streamed = [turn for piece in pieces for turn in turns.feed(piece)]
+    assert streamed == [("선생님", '첫 줄\n"인용" 끝'), ("학생", "질문?")]
+
+
+def test_last_turn_waits_for_closing_quote():
+    turns = _StreamingScriptTurns()
+    assert list(turns.feed('{"title": "t", "script": "[선생님] 하나 [학생] 둘')) == [("선생님", "하나")]
+    assert list(turns.feed(' 셋"}')) == [("학생", "둘 셋")]
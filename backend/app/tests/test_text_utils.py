@@ -0,0 +1,28 @@
+from app.langgraph_pipeline.podcast.utils import chunk_text, sanitize_tts_text
+
+
+def test_sanitize_replaces_name_tags_and_collapses_whitespace():
+    text = "  [진행자 이름]님,\n\t안녕하세요!  [게스트이름]과 함께해요. "
+    assert sanitize_tts_text(text, "민수", "지은") == "민수님, 안녕하세요! 지은과 함께해요."
+
+
+def test_sanitize_defaults_when_names_missing():
+    assert sanitize_tts_text("[게스트 이름]과 [진행자이름]", "", None) == "과 진행자"
+
+
+def test_sanitize_drops_control_and_disallowed_chars():
+    assert sanitize_tts_text("﻿시작\x00 (괄호) 😀 OK?") == "시작 괄호  OK?"
+
+
+def test_chunk_text_short_input_single_chunk():
+    assert chunk_text("  짧은   문장  ", 200) == ["짧은 문장"]
+
+
+def test_chunk_text_splits_on_sentence_boundaries():
+    assert chunk_text("가나다. 라마바? 사아자! 차카타", 10) == ["가나다.라마바?", "사아자!차카타"]
+    assert chunk_text("하나.둘.셋.넷", 4) == ["하나.", "둘.셋.", "넷"]
+
+
+def test_chunk_text_keeps_overlong_sentence_whole():
+    # 한 문장이 max_chars보다 길어도 문장 중간에서 자르지 않음
+    assert chunk_text("아주아주긴문장입니다. 끝.", 5) == ["아주아주긴문장입니다.", "끝."]
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.langgraph_pipeline.podcast import tts_service
+from app.langgraph_pipeline.podcast.tts_service import _QuotaGate, _iter_turns
+
+
+def test_quota_gate_waits_for_latest_deadline():
+    async def scenario():
+        gate = _QuotaGate()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        # 짧은 대기가 먼저 끝나도 더 긴 대기가 끝날 때까지 게이트는 닫혀 있어야 함
+        gate.block_for(0.2)
+        gate.block_for(0.05)
+        await gate.wait()
+        return loop.time() - start
+
+    assert asyncio.run(scenario()) >= 0.2
+
+
+def test_quota_gate_open_by_default():
+    async def scenario():
+        gate = _QuotaGate()
+        await asyncio.wait_for(gate.wait(), timeout=0.05)
+
+    asyncio.run(scenario())
+
+
+def test_tts_cache_key_includes_model_and_config(monkeypatch):
+    path = tts_service._tts_cache_path("Kore", "안녕하세요")
+    assert path == tts_service._tts_cache_path("Kore", "안녕하세요")
+    assert path != tts_service._tts_cache_path("Leda", "안녕하세요")
+
+    monkeypatch.setattr(tts_service, "TTS_MODEL_NAME", "other-tts-model")
+    assert path != tts_service._tts_cache_path("Kore", "안녕하세요")
+
+
+def test_tts_cache_ignores_expired_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_service, "TTS_CACHE_MAX_AGE", 60)
+    path = tmp_path / "chunk.pcm"
+    path.write_bytes(b"\x01\x00")
+    assert tts_service._read_tts_cache(str(path)) == b"\x01\x00"
+
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert tts_service._read_tts_cache(str(path)) is None
+
+
+def test_tts_cache_prune_removes_oldest_over_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_service, "TTS_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(tts_service, "TTS_CACHE_MAX_BYTES", 250)
+    monkeypatch.setattr(tts_service, "_cache_pruned_at", 0.0)
+    now = time.time()
+    for i, name in enumerate(["a", "b", "c"]):
+        path = tmp_path / f"{name}.pcm"
+        path.write_bytes(b"\x00" * 100)
+        os.utime(path, (now - 30 + i, now - 30 + i))
+
+    tts_service._prune_tts_cache()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["b.pcm", "c.pcm"]
+
+
+@pytest.mark.parametrize("script,expected", [
+    ("[선생님] 안녕 [학생] 네", [("선생님", "안녕"), ("학생", "네")]),
+    # 첫 태그 앞 텍스트와 내용이 빈 턴은 건너뛰고, [] 빈 태그는 본문으로 유지
+    ("도입부 [선생님] 첫 턴 [] 빈 태그 [학생]   [선생님] 끝", [("선생님", "첫 턴 [] 빈 태그"), ("선생님", "끝")]),
+    # 태그가 없으면 전체가 선생님 턴
+    ("태그 없음", [("선생님", "태그 없음")]),
+    # 닫히지 않은 '['부터는 본문
+    ("[선생님] 닫히지 않은 [태그 뒤", [("선생님", "닫히지 않은 [태그 뒤")]),
+    # 태그 안의 '['는 다음 ']'까지 태그에 포함
+    ("[선생님] 말 [a [학생] 끝", [("선생님", "말"), ("a [학생", "끝")]),
+    ("[ 학생 ] 공백 태그", [("학생", "공백 태그")]),
+    ("", []),
+])
+def test_iter_turns(script, expected):
+    assert list(_iter_turns(script)) == expected
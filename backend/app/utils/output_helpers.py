@@ -42,6 +42,10 @@ def to_seconds(time_str):
     if isinstance(time_str, (int, float)):
         return float(time_str)
 
+    # 트랜스크립트 기본 형식 "HH:MM:SS"는 고정 위치 슬라이스로 바로 계산 (split 리스트 없음)
+    if len(time_str) == 8 and time_str[2] == ":" and time_str[5] == ":":
+        return int(time_str[0:2]) * 3600 + int(time_str[3:5]) * 60 + float(time_str[6:8])
+
     parts = time_str.split(":")
     if len(parts) == 3:
         h, m, s = parts